@@ -0,0 +1,172 @@
+import argparse
+import csv
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+
+from .config import City, Config
+from .generate_cities import generate_cities
+from .island import IslandTrainer
+from .profiling import Profiler
+from .trainer import GeneticTrainer
+from .tsp_dp import tsp_dynamic_programming
+from .utils import log_info
+
+FIELDNAMES = [
+    "n_cities",
+    "seed",
+    "dp_cost",
+    "dp_time",
+    "dp_memory_mb",
+    "ga_cost",
+    "ga_time",
+    "ga_memory_mb",
+    "ga_generations",
+    "gap",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the TSP solvers over instances of increasing size"
+    )
+    parser.add_argument(
+        "--hparams_fp",
+        type=Path,
+        default=Path("configs/hparams.json"),
+        help="Path to the JSON file containing the hyperparameters",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[8, 10, 12, 14, 16, 18, 20],
+        help="Numbers of cities of the generated instances",
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        nargs="+",
+        default=[0, 1, 2],
+        help="Seeds of the generated instances and of the genetic algorithm",
+    )
+    parser.add_argument(
+        "--max_dp_cities",
+        type=int,
+        default=22,
+        help="Largest instance solved with dynamic programming",
+    )
+    parser.add_argument(
+        "--stop_tolerance",
+        type=float,
+        default=1e-4,
+        help="Relative gap to the optimum at which the genetic algorithm stops",
+    )
+    parser.add_argument(
+        "--output_fp",
+        type=Path,
+        default=Path("benchmark_results.csv"),
+        help="Path to the CSV or JSON results file",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Measure the peak memory of both solvers in a separate run "
+        "under tracemalloc, which is too slow to be timed",
+    )
+    return parser.parse_args()
+
+
+def save_results(results, file_path, fieldnames=FIELDNAMES):
+    """Save benchmark results to a CSV or JSON file, based on its suffix
+
+    Args:
+        results: List of results rows
+        file_path: Path to the results file
+        fieldnames: Columns of the CSV file
+    """
+    if file_path.suffix == ".json":
+        file_path.write_text(json.dumps(results, indent=2))
+        return
+    with open(file_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def benchmark_instance(
+    hparams, n_cities, seed, max_dp_cities, stop_tolerance, memory=False
+):
+    """Running both solvers on a generated instance
+
+    Args:
+        hparams: Hyperparameters of the genetic algorithm
+        n_cities: Number of cities
+        seed: Seed of the instance and of the genetic algorithm
+        max_dp_cities: Largest instance solved with dynamic programming
+        stop_tolerance: Relative gap to the optimum at which the GA stops
+        memory: Whether to measure the peak memory of the solvers
+
+    Returns:
+        Results row
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    cities = [City(**city) for city in generate_cities(n_cities, 0, 100)]
+    config = Config(cities=cities, **hparams)
+    result = dict.fromkeys(FIELDNAMES)
+    result.update(n_cities=n_cities, seed=seed)
+
+    profiler = Profiler(memory=memory)
+    stop_threshold = 0.0
+    if n_cities <= max_dp_cities:
+        dp_cost, run_time, peak_memory = profiler.run(
+            "dynamic_programming", tsp_dynamic_programming, config.city_coords
+        )
+        stop_threshold = dp_cost * (1 + stop_tolerance)
+        result.update(dp_cost=dp_cost, dp_time=run_time, dp_memory_mb=peak_memory)
+
+    trainer = IslandTrainer(config) if config.n_islands > 1 else GeneticTrainer(config)
+    outputs, run_time, peak_memory = profiler.run(
+        "genetic_algorithm",
+        trainer.fit,
+        stop_threshold=stop_threshold,
+        traced_kwargs={"record": False},
+    )
+    result.update(
+        ga_cost=outputs["best_fitness"],
+        ga_time=run_time,
+        ga_memory_mb=peak_memory,
+        ga_generations=outputs["n_generations"],
+    )
+    if result["dp_cost"]:
+        gap = outputs["best_fitness"] - result["dp_cost"]
+        result["gap"] = gap / result["dp_cost"]
+    return result
+
+
+def main():
+    args = parse_args()
+    hparams = json.loads(args.hparams_fp.read_text())
+    results = []
+    for n_cities in args.sizes:
+        for seed in args.seeds:
+            log_info("Benchmarking %d cities with seed %d...", n_cities, seed)
+            result = benchmark_instance(
+                hparams,
+                n_cities,
+                seed,
+                args.max_dp_cities,
+                args.stop_tolerance,
+                args.memory,
+            )
+            log_info("Result: %s", result)
+            results.append(result)
+            save_results(results, args.output_fp)
+    log_info("Saved results to %s", args.output_fp)
+
+
+if __name__ == "__main__":
+    main()
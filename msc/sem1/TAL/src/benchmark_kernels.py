@@ -0,0 +1,169 @@
+import argparse
+import random
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from . import kernels
+from .benchmark import save_results
+from .config import City, Config
+from .crossover import _random_segment, _segment_fill_batch
+from .local_search import improve_tour, nearest_neighbours
+from .trainer import GeneticTrainer
+from .tsp_dp import tsp_dynamic_programming
+from .utils import distance_matrix, log_info
+
+FIELDNAMES = ["kernel", "numpy_time", "numba_time", "speedup"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the Numba kernels against the NumPy implementations"
+    )
+    parser.add_argument(
+        "--n_cities", type=int, default=200, help="Number of cities of the GA kernels"
+    )
+    parser.add_argument(
+        "--n_population", type=int, default=1000, help="Number of individuals"
+    )
+    parser.add_argument(
+        "--n_dp_cities",
+        type=int,
+        default=16,
+        help="Number of cities of the dynamic programming benchmark",
+    )
+    parser.add_argument(
+        "--n_repeats", type=int, default=5, help="Number of timed repetitions"
+    )
+    parser.add_argument(
+        "--output_fp",
+        type=Path,
+        default=Path("benchmark_kernels.csv"),
+        help="Path to the CSV or JSON results file",
+    )
+    return parser.parse_args()
+
+
+def best_time(fn, n_repeats):
+    """Measuring the best run time of a function, after a warm-up call \
+        which compiles the Numba kernels
+
+    Args:
+        fn: Function without arguments
+        n_repeats: Number of timed calls
+
+    Returns:
+        Best run time in seconds
+    """
+    fn()
+    run_times = []
+    for _ in range(n_repeats):
+        start_time = perf_counter()
+        fn()
+        run_times.append(perf_counter() - start_time)
+    return min(run_times)
+
+
+def kernel_cases(args, rng):
+    """Building the NumPy and Numba forms of every benchmarked kernel
+
+    Args:
+        args: Command line arguments
+        rng: NumPy random generator
+
+    Returns:
+        Dictionary mapping kernel names to pairs of functions
+    """
+    coords = rng.uniform(0, 1000, (args.n_cities, 2))
+    distances = distance_matrix(coords)
+    population = rng.permuted(
+        np.broadcast_to(
+            np.arange(args.n_cities, dtype=np.int32),
+            (args.n_population, args.n_cities),
+        ),
+        axis=1,
+    )
+    half = args.n_population // 2
+    starts, ends = _random_segment(args.n_cities, half)
+    neighbours = nearest_neighbours(distances, 8)
+    neighbours_lists = neighbours.tolist()
+    tours = population[:20]
+    dp_coords = {f"{i}": tuple(xy) for i, xy in enumerate(coords[: args.n_dp_cities])}
+
+    def numpy_local_search():
+        for tour in tours:
+            improve_tour(tour, distances, neighbours_lists)
+
+    def numba_local_search():
+        for tour in tours:
+            kernels.improve_tour(tour.copy(), distances, neighbours)
+
+    cities = [City(name=f"{i}", x=x, y=y) for i, (x, y) in enumerate(coords)]
+
+    def fit(use_numba):
+        config = Config(
+            cities=cities,
+            n_population=args.n_population,
+            n_generations=20,
+            log_interval=20,
+            crossover="order",
+            local_search=True,
+            use_numba=use_numba,
+        )
+        trainer = GeneticTrainer(config)
+        return lambda: trainer.fit()
+
+    return {
+        "tour_lengths": (
+            lambda: distances[population, np.roll(population, -1, axis=1)].sum(axis=1),
+            lambda: kernels.tour_lengths(distances, population),
+        ),
+        "order_crossover": (
+            lambda: _segment_fill_batch(
+                population[:half], population[half:], starts, ends, ends
+            ),
+            lambda: kernels.segment_fill_batch(
+                population[:half], population[half:], starts, ends, ends
+            ),
+        ),
+        "local_search": (numpy_local_search, numba_local_search),
+        "held_karp": (
+            lambda: tsp_dynamic_programming(dp_coords, return_tour=True),
+            lambda: tsp_dynamic_programming(
+                dp_coords, return_tour=True, use_numba=True
+            ),
+        ),
+        "genetic_algorithm": (fit(False), fit(True)),
+    }
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    results = []
+    for name, (numpy_fn, numba_fn) in kernel_cases(args, rng).items():
+        random.seed(0)
+        np.random.seed(0)
+        numpy_time = best_time(numpy_fn, args.n_repeats)
+        numba_time = best_time(numba_fn, args.n_repeats)
+        result = {
+            "kernel": name,
+            "numpy_time": numpy_time,
+            "numba_time": numba_time,
+            "speedup": numpy_time / numba_time,
+        }
+        log_info(
+            "%s: NumPy %.4f s, Numba %.4f s, %.1fx speedup",
+            name,
+            numpy_time,
+            numba_time,
+            result["speedup"],
+        )
+        results.append(result)
+    save_results(results, args.output_fp, FIELDNAMES)
+    log_info("Saved results to %s", args.output_fp)
+
+
+if __name__ == "__main__":
+    main()
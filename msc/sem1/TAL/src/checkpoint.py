@@ -0,0 +1,107 @@
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def rng_state():
+    """Capturing the states of the NumPy and Python global RNGs as arrays
+
+    Returns:
+        Dictionary of arrays describing both states
+    """
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    version, internal_state, gauss_next = random.getstate()
+    return {
+        "np_random_keys": keys,
+        "np_random_pos": np.array(pos),
+        "np_random_gauss": np.array([has_gauss, cached_gaussian], dtype=np.float64),
+        "py_random_version": np.array(version),
+        "py_random_state": np.array(internal_state, dtype=np.uint64),
+        "py_random_gauss": np.array(
+            np.nan if gauss_next is None else gauss_next, dtype=np.float64
+        ),
+    }
+
+
+def set_rng_state(state):
+    """Restoring the states of the NumPy and Python global RNGs
+
+    Args:
+        state: Dictionary of arrays returned by `rng_state`
+    """
+    has_gauss, cached_gaussian = state["np_random_gauss"]
+    np.random.set_state(
+        (
+            "MT19937",
+            state["np_random_keys"],
+            int(state["np_random_pos"]),
+            int(has_gauss),
+            float(cached_gaussian),
+        )
+    )
+    gauss_next = float(state["py_random_gauss"])
+    random.setstate(
+        (
+            int(state["py_random_version"]),
+            tuple(int(value) for value in state["py_random_state"]),
+            None if np.isnan(gauss_next) else gauss_next,
+        )
+    )
+
+
+def save_checkpoint(file_path: Path, state):
+    """Saving a checkpoint as a compressed `.npz`, the file is written \
+        next to the previous checkpoint and then replaces it, so an interrupted \
+        write never corrupts it
+
+    Args:
+        file_path: Path to the checkpoint file
+        state: Dictionary of arrays
+    """
+    tmp_fp = file_path.with_name(f"{file_path.stem}.tmp.npz")
+    np.savez_compressed(tmp_fp, **state)
+    os.replace(tmp_fp, file_path)
+
+
+def load_checkpoint(file_path: Path):
+    """Loading a checkpoint
+
+    Args:
+        file_path: Path to the checkpoint file
+
+    Returns:
+        Dictionary of arrays
+    """
+    with np.load(file_path) as checkpoint:
+        return dict(checkpoint)
+
+
+class CheckpointWriter:
+    """Writing checkpoints in a background thread, the saved arrays are copied \
+        so that the evolution can go on while a checkpoint is written
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+
+    def save(self, state):
+        """Scheduling a checkpoint write
+
+        Args:
+            state: Dictionary of arrays
+        """
+        state = {name: np.array(value, copy=True) for name, value in state.items()}
+        if self.pending is not None and self.pending.done():
+            self.pending.result()
+        self.pending = self.executor.submit(save_checkpoint, self.file_path, state)
+
+    def close(self):
+        """Waiting for the pending writes"""
+        self.executor.shutdown(wait=True)
+        if self.pending is not None:
+            self.pending.result()
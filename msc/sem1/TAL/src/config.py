@@ -2,8 +2,10 @@ import csv
 import json
 from datetime import datetime
 from pathlib import Path
+from typing import Literal
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, PrivateAttr
 
 
 class City(BaseModel):
@@ -12,30 +14,212 @@ class City(BaseModel):
     y: float
 
 
+def cities_array(names, x, y):
+    """Building the structured array of cities
+
+    Args:
+        names: Cities names
+        x: X coordinates of the cities
+        y: Y coordinates of the cities
+
+    Returns:
+        Structured array with `name`, `x` and `y` fields
+    """
+    names = np.asarray(names, dtype=np.str_)
+    cities = np.empty(
+        len(names), dtype=[("name", names.dtype), ("x", np.float64), ("y", np.float64)]
+    )
+    cities["name"], cities["x"], cities["y"] = names, x, y
+    return cities
+
+
+def read_tsv(file_path: Path):
+    """Reading cities from a TSV file with `name`, `x` and `y` columns
+
+    Args:
+        file_path: Path to the TSV file
+
+    Returns:
+        Structured array of cities
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    return cities_array(
+        [row["name"] for row in rows],
+        [float(row["x"]) for row in rows],
+        [float(row["y"]) for row in rows],
+    )
+
+
+def read_tsplib(file_path: Path):
+    """Reading cities from the `NODE_COORD_SECTION` of a TSPLIB `.tsp` file, \
+        the nodes numbers are used as cities names
+
+    Only EUC_2D instances are read. The solvers use unrounded Euclidean
+    distances, while TSPLIB rounds EUC_2D distances to the nearest integer,
+    so tour costs do not match the published TSPLIB values.
+
+    Args:
+        file_path: Path to the TSPLIB file
+
+    Returns:
+        Structured array of cities
+    """
+    text = Path(file_path).read_text()
+    header, found, section = text.partition("NODE_COORD_SECTION")
+    if not found:
+        raise ValueError(f"{file_path} has no NODE_COORD_SECTION")
+    specification = dict(
+        (key.strip(), value.strip())
+        for key, _, value in (
+            line.partition(":") for line in header.splitlines() if ":" in line
+        )
+    )
+    if specification.get("EDGE_WEIGHT_TYPE", "EUC_2D") != "EUC_2D":
+        raise ValueError(
+            f"Unsupported edge weight type: {specification['EDGE_WEIGHT_TYPE']}, "
+            "only EUC_2D coordinates are read, with unrounded Euclidean distances "
+            "whose costs do not match the TSPLIB values"
+        )
+    nodes = section.split("EOF")[0].split()
+    if len(nodes) % 3:
+        raise ValueError(f"{file_path} has a malformed NODE_COORD_SECTION")
+    names = nodes[0::3]
+    if "DIMENSION" in specification and int(specification["DIMENSION"]) != len(names):
+        raise ValueError(
+            f"{file_path} declares {specification['DIMENSION']} nodes, "
+            f"found {len(names)}"
+        )
+    return cities_array(
+        names,
+        np.array(nodes[1::3], dtype=np.float64),
+        np.array(nodes[2::3], dtype=np.float64),
+    )
+
+
+def read_npy(file_path: Path):
+    """Memory-mapping cities from a `.npy` file, either a structured array \
+        with `name`, `x` and `y` fields or a float64 array of shape (n_cities, 2) \
+        of coordinates, viewed as a structured array without names
+
+    Args:
+        file_path: Path to the `.npy` file
+
+    Returns:
+        Memory-mapped structured array of cities
+    """
+    cities = np.load(file_path, mmap_mode="r")
+    if cities.dtype.names is not None:
+        return cities
+    if cities.ndim != 2 or cities.shape[1] != 2 or cities.dtype != np.float64:
+        raise ValueError(
+            f"Expected float64 coordinates of shape (n_cities, 2) in {file_path}"
+        )
+    return cities.view([("x", np.float64), ("y", np.float64)])[:, 0]
+
+
+CITIES_READERS = {".tsv": read_tsv, ".tsp": read_tsplib, ".npy": read_npy}
+
+
 class Config(BaseModel):
-    cities: list[City]
+    cities: list[City] = []
+    cities_fp: Path | None = None
     n_population: int = 250
     n_generations: int = 200
     crossover_per: float = 0.8
     mutation_per: float = 0.2
     log_interval: int = 10
     log_dir: Path = Path("logs")
+    distance_dtype: Literal["float32", "float64"] = "float64"
+    max_distance_matrix_mb: float = 4096.0
+    selection: Literal[
+        "roulette_wheel", "stochastic_universal_sampling", "tournament"
+    ] = "roulette_wheel"
+    tournament_size: int = 3
+    crossover: Literal["one_point", "order", "pmx", "edge_recombination"] = "one_point"
+    n_islands: int = 1
+    migration_interval: int = 10
+    migration_size: int = 2
+    migration_topology: Literal["ring", "random"] = "ring"
+    local_search: bool = False
+    local_search_per: float = 0.2
+    n_neighbours: int = 8
+    seeding: Literal["none", "nearest_neighbour", "greedy_edge"] = "none"
+    seeding_per: float = 0.1
+    fitness_cache_size: int = 0
+    checkpoint_interval: int = 0
+    metrics_interval: int = 1
+    replacement: Literal["generational", "steady_state"] = "generational"
+    use_numba: bool = False
+    # Views of the cities computed on first access, not pickled so that worker
+    # processes memory-map `cities_fp` again instead of receiving a copy
+    _cache: dict = PrivateAttr(default_factory=dict)
 
     def model_post_init(self, __context):
-        self.log_dir = self.log_dir / datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        # Validating with `context={"timestamp_log_dir": False}` keeps `log_dir`
+        if (__context or {}).get("timestamp_log_dir", True):
+            self.log_dir = self.log_dir / datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.log_dir.mkdir(exist_ok=True, parents=True)
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {**state["__pydantic_private__"], "_cache": {}}
+        return state
+
+    def _cached(self, name, fn):
+        if name not in self._cache:
+            self._cache[name] = fn()
+        return self._cache[name]
+
+    @property
+    def cities_array(self):
+        """Structured array of cities with `x`, `y` and usually `name` fields, \
+            read from `cities_fp` if set and built from `cities` otherwise"""
+        if self.cities_fp is not None:
+            return self._cached(
+                "cities_array",
+                lambda: CITIES_READERS[self.cities_fp.suffix](self.cities_fp),
+            )
+        return self._cached(
+            "cities_array",
+            lambda: cities_array(
+                [city.name for city in self.cities],
+                [city.x for city in self.cities],
+                [city.y for city in self.cities],
+            ),
+        )
+
     @property
     def city_coords(self):
-        return {city.name: (city.x, city.y) for city in self.cities}
+        return self._cached(
+            "city_coords",
+            lambda: dict(zip(self.cities_names, map(tuple, self.coords.tolist()))),
+        )
 
     @property
     def cities_names(self):
-        return [city.name for city in self.cities]
+        if "name" not in self.cities_array.dtype.names:
+            return self._cached(
+                "cities_names", lambda: [str(i) for i in range(1, self.n_cities + 1)]
+            )
+        return self._cached("cities_names", lambda: self.cities_array["name"].tolist())
+
+    @property
+    def city_index(self):
+        return self._cached(
+            "city_index",
+            lambda: {name: i for i, name in enumerate(self.cities_names)},
+        )
+
+    @property
+    def coords(self):
+        from numpy.lib.recfunctions import structured_to_unstructured
+
+        return structured_to_unstructured(self.cities_array[["x", "y"]])
 
     @property
     def n_cities(self):
-        return len(self.cities)
+        return len(self.cities_array)
 
     @property
     def crossover_size(self):
@@ -47,7 +231,7 @@ class Config(BaseModel):
 
     @classmethod
     def from_files(cls, hparams_fp: Path, cities_fp: Path) -> "Config":
-        with open(cities_fp, "r", encoding="utf-8") as f:
-            cities = [City(**row) for row in csv.DictReader(f, delimiter="\t")]
+        if cities_fp.suffix not in CITIES_READERS:
+            raise ValueError(f"Unsupported cities file format: {cities_fp.suffix}")
         hparams = json.loads(hparams_fp.read_text())
-        return cls(cities=cities, **hparams)
+        return cls(cities_fp=cities_fp, **hparams)
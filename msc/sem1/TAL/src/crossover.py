@@ -0,0 +1,293 @@
+import numpy as np
+
+
+def _segment_fill(head_parent, tail_parent, start, end, tail_from):
+    """Copying a segment from one parent and filling the positions after it \
+        with the unused cities in the order they appear in the other parent
+
+    Args:
+        head_parent: Parent supplying the segment
+        tail_parent: Parent supplying the remaining cities
+        start: First position of the segment
+        end: Position after the last one of the segment
+        tail_from: Position in `tail_parent` from which the remaining cities \
+            are taken, wrapping around the tour
+
+    Returns:
+        Offspring individual
+    """
+    n_cities = len(head_parent)
+    used = np.zeros(n_cities, dtype=bool)
+    used[head_parent[start:end]] = True
+    tail = np.roll(tail_parent, -tail_from)
+    tail = tail[~used[tail]]
+    offspring = np.empty_like(head_parent)
+    offspring[start:end] = head_parent[start:end]
+    offspring[(end + np.arange(len(tail))) % n_cities] = tail
+    return offspring
+
+
+def _random_segment(n_cities, size=None):
+    """Drawing random segment bounds `start <= end` of a tour
+
+    Args:
+        n_cities: Number of cities in the tour
+        size: Number of segments to draw, a single one if None
+
+    Returns:
+        Tuple of segment starts and ends
+    """
+    shape = (2,) if size is None else (2, size)
+    bounds = np.sort(np.random.randint(0, n_cities + 1, size=shape), axis=0)
+    if size is None:
+        return int(bounds[0]), int(bounds[1])
+    return bounds[0], bounds[1]
+
+
+def one_point_crossover(parent_1, parent_2):
+    """Simple crossover, the head of one parent up to a random cut \
+        followed by the remaining cities in the order of the other parent
+
+    Args:
+        parent_1: First parent, array of cities indices
+        parent_2: Second parent, array of cities indices
+
+    Returns:
+        offspring_1: First offspring
+        offspring_2: Second offspring
+    """
+    cut = np.random.randint(1, len(parent_1))
+    offspring_1 = _segment_fill(parent_1, parent_2, 0, cut, 0)
+    offspring_2 = _segment_fill(parent_2, parent_1, 0, cut, 0)
+    return offspring_1, offspring_2
+
+
+def order_crossover(parent_1, parent_2):
+    """Order crossover (OX), a random segment of one parent is kept in place \
+        and the rest is filled in the order of the other parent starting after the segment
+
+    Args:
+        parent_1: First parent, array of cities indices
+        parent_2: Second parent, array of cities indices
+
+    Returns:
+        offspring_1: First offspring
+        offspring_2: Second offspring
+    """
+    start, end = _random_segment(len(parent_1))
+    offspring_1 = _segment_fill(parent_1, parent_2, start, end, end)
+    offspring_2 = _segment_fill(parent_2, parent_1, start, end, end)
+    return offspring_1, offspring_2
+
+
+def _pmx_offspring(head_parent, tail_parent, start, end):
+    """Building one PMX offspring
+
+    Args:
+        head_parent: Parent supplying the mapped segment
+        tail_parent: Parent supplying the remaining positions
+        start: First position of the segment
+        end: Position after the last one of the segment
+
+    Returns:
+        Offspring individual
+    """
+    offspring = tail_parent.copy()
+    offspring[start:end] = head_parent[start:end]
+    in_segment = np.zeros(len(head_parent), dtype=bool)
+    in_segment[head_parent[start:end]] = True
+    head_position = np.empty_like(head_parent)
+    head_position[head_parent] = np.arange(len(head_parent))
+
+    outside = np.ones(len(head_parent), dtype=bool)
+    outside[start:end] = False
+    (conflicts,) = np.nonzero(outside & in_segment[tail_parent])
+    for position in conflicts:
+        city = tail_parent[position]
+        while in_segment[city]:
+            city = tail_parent[head_position[city]]
+        offspring[position] = city
+    return offspring
+
+
+def partially_mapped_crossover(parent_1, parent_2):
+    """Partially mapped crossover (PMX), a random segment is swapped between \
+        the parents and duplicates outside of it are resolved through the segment mapping
+
+    Args:
+        parent_1: First parent, array of cities indices
+        parent_2: Second parent, array of cities indices
+
+    Returns:
+        offspring_1: First offspring
+        offspring_2: Second offspring
+    """
+    start, end = _random_segment(len(parent_1))
+    offspring_1 = _pmx_offspring(parent_1, parent_2, start, end)
+    offspring_2 = _pmx_offspring(parent_2, parent_1, start, end)
+    return offspring_1, offspring_2
+
+
+def _edge_table(parent_1, parent_2):
+    """Building the table of neighbours of every city in both parents
+
+    Args:
+        parent_1: First parent, array of cities indices
+        parent_2: Second parent, array of cities indices
+
+    Returns:
+        Array of shape (n_cities, 4) with neighbours, duplicates replaced by -1
+    """
+    edges = np.empty((len(parent_1), 4), dtype=parent_1.dtype)
+    for i, parent in enumerate((parent_1, parent_2)):
+        edges[parent, 2 * i] = np.roll(parent, 1)
+        edges[parent, 2 * i + 1] = np.roll(parent, -1)
+    edges.sort(axis=1)
+    edges[:, 1:][edges[:, 1:] == edges[:, :-1]] = -1
+    return edges
+
+
+def _erx_offspring(edges, start_city):
+    """Building one edge recombination offspring
+
+    Args:
+        edges: Edge table of both parents
+        start_city: City the offspring starts from
+
+    Returns:
+        Offspring individual
+    """
+    n_cities = len(edges)
+    neighbours = [[city for city in row if city >= 0] for row in edges.tolist()]
+    n_free_edges = [len(row) for row in neighbours]
+    used = [False] * n_cities
+    fallback = np.random.permutation(n_cities).tolist()
+    fallback_pos = 0
+    offspring = np.empty(n_cities, dtype=edges.dtype)
+    city = int(start_city)
+    for i in range(n_cities):
+        offspring[i] = city
+        used[city] = True
+        next_city, next_free_edges = -1, 5
+        for neighbour in neighbours[city]:
+            n_free_edges[neighbour] -= 1
+            if not used[neighbour] and n_free_edges[neighbour] < next_free_edges:
+                next_city, next_free_edges = neighbour, n_free_edges[neighbour]
+        if next_city < 0:
+            while fallback_pos < n_cities and used[fallback[fallback_pos]]:
+                fallback_pos += 1
+            if fallback_pos < n_cities:
+                next_city = fallback[fallback_pos]
+        city = next_city
+    return offspring
+
+
+def edge_recombination_crossover(parent_1, parent_2):
+    """Edge recombination crossover (ERX), offspring are built from edges \
+        present in either parent, preferring cities with the fewest remaining edges
+
+    Args:
+        parent_1: First parent, array of cities indices
+        parent_2: Second parent, array of cities indices
+
+    Returns:
+        offspring_1: First offspring
+        offspring_2: Second offspring
+    """
+    edges = _edge_table(parent_1, parent_2)
+    offspring_1 = _erx_offspring(edges, parent_1[0])
+    offspring_2 = _erx_offspring(edges, parent_2[0])
+    return offspring_1, offspring_2
+
+
+def _segment_fill_batch(head_parents, tail_parents, starts, ends, tails_from):
+    """Batched form of `_segment_fill`, one offspring per row of the parents
+
+    Args:
+        head_parents: Parents supplying the segments, shape (n_pairs, n_cities)
+        tail_parents: Parents supplying the remaining cities
+        starts: First positions of the segments
+        ends: Positions after the last ones of the segments
+        tails_from: Positions in `tail_parents` from which the remaining cities are taken
+
+    Returns:
+        Array of offspring
+    """
+    n_pairs, n_cities = head_parents.shape
+    positions = np.arange(n_cities)
+    in_segment = (positions >= starts[:, None]) & (positions < ends[:, None])
+    used = np.zeros_like(in_segment)
+    np.put_along_axis(used, head_parents, in_segment, axis=1)
+
+    tail_positions = (positions + tails_from[:, None]) % n_cities
+    tail = np.take_along_axis(tail_parents, tail_positions, axis=1)
+    keep = ~np.take_along_axis(used, tail, axis=1)
+    fill = positions < (n_cities - (ends - starts))[:, None]
+    fill_positions = (positions + ends[:, None]) % n_cities
+
+    offspring = np.where(in_segment, head_parents, 0)
+    rows = np.broadcast_to(np.arange(n_pairs)[:, None], fill.shape)
+    offspring[rows[fill], fill_positions[fill]] = tail[keep]
+    return offspring
+
+
+def _one_point_crossover_batch(parents_1, parents_2, segment_fill=_segment_fill_batch):
+    """Batched form of `one_point_crossover`"""
+    n_pairs, n_cities = parents_1.shape
+    starts = np.zeros(n_pairs, dtype=np.intp)
+    cuts = np.random.randint(1, n_cities, size=n_pairs)
+    offspring_1 = segment_fill(parents_1, parents_2, starts, cuts, starts)
+    offspring_2 = segment_fill(parents_2, parents_1, starts, cuts, starts)
+    return offspring_1, offspring_2
+
+
+def _order_crossover_batch(parents_1, parents_2, segment_fill=_segment_fill_batch):
+    """Batched form of `order_crossover`"""
+    _, n_cities = parents_1.shape
+    starts, ends = _random_segment(n_cities, len(parents_1))
+    offspring_1 = segment_fill(parents_1, parents_2, starts, ends, ends)
+    offspring_2 = segment_fill(parents_2, parents_1, starts, ends, ends)
+    return offspring_1, offspring_2
+
+
+CROSSOVER_OPERATORS = {
+    "one_point": one_point_crossover,
+    "order": order_crossover,
+    "pmx": partially_mapped_crossover,
+    "edge_recombination": edge_recombination_crossover,
+}
+
+_BATCHED_CROSSOVER_OPERATORS = {
+    "one_point": _one_point_crossover_batch,
+    "order": _order_crossover_batch,
+}
+
+
+def crossover_batch(parents_1, parents_2, operator="one_point", use_numba=False):
+    """Producing the offspring of all pairs of parents at once
+
+    Args:
+        parents_1: First parents, array of shape (n_pairs, n_cities)
+        parents_2: Second parents, array of shape (n_pairs, n_cities)
+        operator: Name of the crossover operator
+        use_numba: Whether the batched operators fill the offspring \
+            with the compiled kernel
+
+    Returns:
+        offspring_1: First offspring of every pair
+        offspring_2: Second offspring of every pair
+    """
+    if operator in _BATCHED_CROSSOVER_OPERATORS:
+        segment_fill = _segment_fill_batch
+        if use_numba:
+            from .kernels import segment_fill_batch as segment_fill
+        return _BATCHED_CROSSOVER_OPERATORS[operator](
+            parents_1, parents_2, segment_fill
+        )
+
+    crossover = CROSSOVER_OPERATORS[operator]
+    offspring_1 = np.empty_like(parents_1)
+    offspring_2 = np.empty_like(parents_2)
+    for i, (parent_1, parent_2) in enumerate(zip(parents_1, parents_2)):
+        offspring_1[i], offspring_2[i] = crossover(parent_1, parent_2)
+    return offspring_1, offspring_2
@@ -0,0 +1,159 @@
+import math
+
+import numpy as np
+
+from .config import Config
+from .shared_array import create_shared_array
+from .utils import DISTANCE_BLOCK_SIZE, distance_matrix, log_info
+
+
+class CoordinateDistances:
+    """Distances computed on the fly from the cities coordinates, \
+        for instances whose dense matrix does not fit in memory
+
+    Indexing follows the distance matrix it stands for: `distances[a, b]`
+    with two indices, or two broadcastable index arrays, gives the distances
+    between the pairs of cities, and `distances[rows]` gives whole rows.
+    Arrays of pairs and rows are computed in vectorized blocks of at most
+    `block_size` distances, so the temporaries stay bounded.
+    """
+
+    def __init__(self, coords, dtype=np.float64, block_size: int = 1 << 20):
+        coords = np.asarray(coords, dtype=np.float64)
+        self.x = np.ascontiguousarray(coords[:, 0])
+        self.y = np.ascontiguousarray(coords[:, 1])
+        # Plain lists make the single distances of the local search cheaper
+        self.x_list = self.x.tolist()
+        self.y_list = self.y.tolist()
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self.shape = (len(coords), len(coords))
+        self.ndim = 2
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            return self._rows(key)
+        rows, cols = key
+        if isinstance(rows, (int, np.integer)) and isinstance(cols, (int, np.integer)):
+            return self.dtype.type(
+                math.hypot(
+                    self.x_list[rows] - self.x_list[cols],
+                    self.y_list[rows] - self.y_list[cols],
+                )
+            )
+        rows, cols = np.broadcast_arrays(rows, cols)
+        return self._pairs(rows.ravel(), cols.ravel()).reshape(rows.shape)
+
+    def _pairs(self, rows, cols):
+        """Computing the distances between pairs of cities
+
+        Args:
+            rows: Array of first cities of the pairs
+            cols: Array of second cities of the pairs
+
+        Returns:
+            Array of distances
+        """
+        distances = np.empty(len(rows), dtype=self.dtype)
+        for start in range(0, len(rows), self.block_size):
+            block = slice(start, start + self.block_size)
+            r, c = rows[block], cols[block]
+            distances[block] = np.hypot(self.x[r] - self.x[c], self.y[r] - self.y[c])
+        return distances
+
+    def _rows(self, rows):
+        """Computing whole rows of the distance matrix
+
+        Args:
+            rows: Index or array of indices of the rows
+
+        Returns:
+            Row, or array of shape (len(rows), n_cities) of rows
+        """
+        rows = np.asarray(rows)
+        if rows.ndim == 0:
+            return np.hypot(self.x[rows] - self.x, self.y[rows] - self.y).astype(
+                self.dtype, copy=False
+            )
+        distances = np.empty((len(rows), len(self)), dtype=self.dtype)
+        n_rows = max(1, self.block_size // len(self))
+        for start in range(0, len(rows), n_rows):
+            block = rows[start : start + n_rows]
+            distances[start : start + len(block)] = np.hypot(
+                self.x[block, None] - self.x[None, :],
+                self.y[block, None] - self.y[None, :],
+            )
+        return distances
+
+
+def _fits_in_memory(config: Config, n_copies: int = 1):
+    """Checking whether building the dense distance matrix, \
+        including the temporaries of `distance_matrix`, stays within \
+        `config.max_distance_matrix_mb`
+
+    Args:
+        config: Config object
+        n_copies: Number of copies of the matrix held by the process
+
+    Returns:
+        Whether the dense matrix fits
+    """
+    itemsize = np.dtype(config.distance_dtype).itemsize
+    matrix_mb = config.n_cities**2 * itemsize / 2**20
+    # Differences of the x and y coordinates of a block, in float64
+    block_mb = 2 * min(DISTANCE_BLOCK_SIZE, config.n_cities**2) * 8 / 2**20
+    peak_mb = n_copies * matrix_mb + block_mb
+    if peak_mb <= config.max_distance_matrix_mb:
+        return True
+    log_info(
+        "Distance matrix needs %.1f MB, which exceeds %.1f MB, "
+        "computing distances on the fly",
+        peak_mb,
+        config.max_distance_matrix_mb,
+    )
+    return False
+
+
+def build_distances(config: Config, n_copies: int = 1):
+    """Building the distances between the cities of the config, \
+        as a dense matrix if building it takes at most \
+        `config.max_distance_matrix_mb` and computed on the fly \
+        from the coordinates otherwise
+
+    Args:
+        config: Config object
+        n_copies: Number of copies of the matrix held by the process, \
+            2 when it is also copied to shared memory
+
+    Returns:
+        Distance matrix or `CoordinateDistances`
+    """
+    if _fits_in_memory(config, n_copies):
+        return distance_matrix(config.coords, config.distance_dtype)
+    return CoordinateDistances(config.coords, config.distance_dtype)
+
+
+def build_shared_distances(config: Config):
+    """Building the distances between the cities of the config like \
+        `build_distances`, writing the dense matrix straight to a new \
+        shared memory block
+
+    Args:
+        config: Config object
+
+    Returns:
+        shm: Shared memory block, to be closed and unlinked by the caller, \
+            None if the distances are computed on the fly
+        distances: Shared distance matrix or `CoordinateDistances`
+        spec: Name, shape and dtype of the matrix, passed to \
+            `attach_shared_array`, None if the distances are computed on the fly
+    """
+    if not _fits_in_memory(config):
+        return None, CoordinateDistances(config.coords, config.distance_dtype), None
+    shape = (config.n_cities, config.n_cities)
+    shm, distances = create_shared_array(shape, config.distance_dtype)
+    distance_matrix(config.coords, out=distances)
+    return shm, distances, (shm.name, shape, distances.dtype)
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from hashlib import blake2b
+
+import numpy as np
+
+
+def canonical_tours(population):
+    """Normalizing tours so that equal cycles have equal rows, \
+        every tour is rotated to start at city 0 and reversed \
+        if its second city is larger than its last one
+
+    Args:
+        population: Array of shape (n_individuals, n_cities) of cities indices
+
+    Returns:
+        Array of canonical tours
+    """
+    n_cities = population.shape[1]
+    starts = np.argmax(population == 0, axis=1)
+    positions = (starts[:, None] + np.arange(n_cities)) % n_cities
+    tours = np.take_along_axis(population, positions, axis=1)
+    if n_cities > 2:
+        flip = tours[:, 1] > tours[:, -1]
+        tours[flip, 1:] = tours[flip, 1:][:, ::-1]
+    return tours
+
+
+class FitnessCache:
+    """Bounded LRU cache of tour lengths keyed by hashes of canonical tours, \
+        returned with the floating point type of the distances
+    """
+
+    def __init__(self, max_size: int, dtype=np.float64):
+        self.max_size = max_size
+        self.dtype = np.dtype(dtype)
+        self.lengths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def clear(self):
+        """Emptying the cache and resetting its counters"""
+        self.lengths.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        n_lookups = self.hits + self.misses
+        return self.hits / n_lookups if n_lookups else 0.0
+
+    def evaluate(self, population, evaluate_fn):
+        """Getting the tour lengths of a population, \
+            only tours missing from the cache are evaluated
+
+        Args:
+            population: Array of shape (n_individuals, n_cities) of cities indices
+            evaluate_fn: Function computing the tour lengths of a population
+
+        Returns:
+            Array of tour lengths
+        """
+        keys = [
+            blake2b(tour.tobytes(), digest_size=16).digest()
+            for tour in canonical_tours(population)
+        ]
+        lengths = np.empty(len(population), dtype=self.dtype)
+        missing = {}
+        for i, key in enumerate(keys):
+            length = self.lengths.get(key)
+            if length is not None:
+                self.lengths.move_to_end(key)
+                lengths[i] = length
+            else:
+                missing.setdefault(key, []).append(i)
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if missing:
+            first_indices = [indices[0] for indices in missing.values()]
+            missing_lengths = evaluate_fn(population[first_indices])
+            for (key, indices), length in zip(missing.items(), missing_lengths):
+                lengths[indices] = length
+                self.lengths[key] = float(length)
+            while len(self.lengths) > self.max_size:
+                self.lengths.popitem(last=False)
+        return lengths
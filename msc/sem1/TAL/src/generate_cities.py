@@ -1,17 +1,22 @@
 import argparse
-import csv
-import random
+from pathlib import Path
 
-import geonamescache
+import numpy as np
 
 from .utils import log_info
 
+LAYOUTS = ("uniform", "clustered", "grid")
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Generate cities with random coordinates"
     )
-    parser.add_argument("--output_fp", type=str, help="Path to the output TSV file")
+    parser.add_argument(
+        "--output_fp",
+        type=Path,
+        help="Path to the output file, TSV, TSPLIB `.tsp` or `.npy` by its suffix",
+    )
     parser.add_argument(
         "--n_cities", type=int, default=10, help="Number of cities to generate"
     )
@@ -21,53 +26,232 @@ def parse_args():
     parser.add_argument(
         "--max_coord", type=float, default=100, help="Maximum coordinate value"
     )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="uniform",
+        help="Spatial distribution of the cities",
+    )
+    parser.add_argument(
+        "--n_clusters",
+        type=int,
+        default=10,
+        help="Number of Gaussian clusters of the clustered layout",
+    )
+    parser.add_argument(
+        "--cluster_std",
+        type=float,
+        default=0.05,
+        help="Standard deviation of the clusters, relative to the coordinates range",
+    )
+    parser.add_argument(
+        "--grid_jitter",
+        type=float,
+        default=0.25,
+        help="Standard deviation of the grid perturbation, relative to the spacing",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=1 << 20,
+        help="Number of cities generated and written at once",
+    )
     return parser.parse_args()
 
 
-def generate_cities(n_cities, min_coord, max_coord):
+def city_names(start, stop):
+    """Generating the synthetic names of a range of cities, \
+        numbered from 1 like the nodes of TSPLIB files
+
+    Args:
+        start: Index of the first city
+        stop: Index after the last city
+
+    Returns:
+        Array of names
+    """
+    return np.char.add("city_", np.arange(start + 1, stop + 1).astype(np.str_))
+
+
+class CityGenerator:
+    """Vectorized generator of cities coordinates, the parameters of the layout \
+        (cluster centres or grid cells) are drawn once and the coordinates \
+        in chunks, so that millions of cities never need to fit in memory at once
+    """
+
+    def __init__(
+        self,
+        n_cities: int,
+        min_coord: float,
+        max_coord: float,
+        layout: str = "uniform",
+        rng: np.random.Generator | None = None,
+        n_clusters: int = 10,
+        cluster_std: float = 0.05,
+        grid_jitter: float = 0.25,
+    ):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout}")
+        self.n_cities = n_cities
+        self.min_coord = min_coord
+        self.max_coord = max_coord
+        self.layout = layout
+        self.rng = rng or np.random.default_rng()
+        extent = max_coord - min_coord
+        if layout == "clustered":
+            self.centres = self.rng.uniform(min_coord, max_coord, (n_clusters, 2))
+            self.std = cluster_std * extent
+        elif layout == "grid":
+            side = int(np.ceil(np.sqrt(n_cities)))
+            self.cells = self.rng.choice(side * side, n_cities, replace=False)
+            self.side = side
+            self.spacing = extent / side
+            self.std = grid_jitter * self.spacing
+
+    def coords(self, start, stop):
+        """Generating the coordinates of a range of cities
+
+        Args:
+            start: Number of the first city
+            stop: Number after the last city
+
+        Returns:
+            Array of shape (stop - start, 2) of coordinates
+        """
+        size = stop - start
+        if self.layout == "uniform":
+            return self.rng.uniform(self.min_coord, self.max_coord, (size, 2))
+        if self.layout == "clustered":
+            labels = self.rng.integers(len(self.centres), size=size)
+            coords = self.centres[labels] + self.rng.normal(0, self.std, (size, 2))
+        else:
+            rows, cols = np.divmod(self.cells[start:stop], self.side)
+            coords = (
+                self.min_coord + (np.column_stack((cols, rows)) + 0.5) * self.spacing
+            )
+            coords += self.rng.normal(0, self.std, (size, 2))
+        return np.clip(coords, self.min_coord, self.max_coord, out=coords)
+
+    def chunks(self, chunk_size):
+        """Generating the coordinates chunk by chunk
+
+        Args:
+            chunk_size: Number of cities of a chunk
+
+        Yields:
+            Number of the first city of the chunk and the coordinates
+        """
+        for start in range(0, self.n_cities, chunk_size):
+            stop = min(start + chunk_size, self.n_cities)
+            yield start, self.coords(start, stop)
+
+
+def generate_cities(n_cities, min_coord, max_coord, layout="uniform", **kwargs):
     """Generate cities with random coordinates
 
     Args:
         n_cities: Number of cities to generate
         min_coord: Minimum coordinate value
         max_coord: Maximum coordinate value
+        layout: Spatial distribution of the cities
+        kwargs: Parameters of the layout passed to `CityGenerator`
 
     Returns:
         List of cities with random coordinates
     """
-    cities = []
-    gc = geonamescache.GeonamesCache()
-    city_names = [x["name"] for x in gc.get_cities().values()]
-    city_names = random.sample(city_names, n_cities)
-    for city_name in city_names:
-        city = {
-            "name": city_name,
-            "x": random.uniform(min_coord, max_coord),
-            "y": random.uniform(min_coord, max_coord),
-        }
-        cities.append(city)
-    return cities
-
-
-def save_cities(cities, file_path):
-    """Save cities to a TSV file
+    rng = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+    generator = CityGenerator(n_cities, min_coord, max_coord, layout, rng, **kwargs)
+    coords = generator.coords(0, n_cities)
+    return [
+        {"name": name, "x": x, "y": y}
+        for name, (x, y) in zip(city_names(0, n_cities).tolist(), coords.tolist())
+    ]
+
+
+def write_tsv(generator, file_path, chunk_size):
+    """Writing generated cities to a TSV file chunk by chunk
 
     Args:
-        cities: List of cities
+        generator: City generator
         file_path: Path to the TSV file
+        chunk_size: Number of cities written at once
     """
-    with open(file_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "x", "y"], delimiter="\t")
-        writer.writeheader()
-        writer.writerows(cities)
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("name\tx\ty\n")
+        for start, coords in generator.chunks(chunk_size):
+            names = city_names(start, start + len(coords))
+            rows = np.column_stack((names, coords.astype(np.str_)))
+            np.savetxt(f, rows, fmt="%s", delimiter="\t")
+
+
+def write_tsplib(generator, file_path, chunk_size):
+    """Writing generated cities to a TSPLIB `.tsp` file chunk by chunk, \
+        the nodes are numbered from 1
+
+    Args:
+        generator: City generator
+        file_path: Path to the TSPLIB file
+        chunk_size: Number of cities written at once
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(
+            f"NAME : {Path(file_path).stem}\n"
+            "TYPE : TSP\n"
+            f"COMMENT : {generator.n_cities} cities, {generator.layout} layout\n"
+            f"DIMENSION : {generator.n_cities}\n"
+            "EDGE_WEIGHT_TYPE : EUC_2D\n"
+            "NODE_COORD_SECTION\n"
+        )
+        for start, coords in generator.chunks(chunk_size):
+            nodes = np.arange(start + 1, start + len(coords) + 1)
+            np.savetxt(
+                f,
+                np.column_stack((nodes, coords)),
+                fmt=("%d", "%.6f", "%.6f"),
+                delimiter=" ",
+            )
+        f.write("EOF\n")
+
+
+def write_npy(generator, file_path, chunk_size):
+    """Writing generated coordinates to a `.npy` file of shape (n_cities, 2) \
+        chunk by chunk through a memory map, the cities are named by their numbers
+
+    Args:
+        generator: City generator
+        file_path: Path to the `.npy` file
+        chunk_size: Number of cities written at once
+    """
+    coords = np.lib.format.open_memmap(
+        file_path, mode="w+", dtype=np.float64, shape=(generator.n_cities, 2)
+    )
+    for start, chunk in generator.chunks(chunk_size):
+        coords[start : start + len(chunk)] = chunk
+    coords.flush()
+    del coords
+
+
+WRITERS = {".tsv": write_tsv, ".tsp": write_tsplib, ".npy": write_npy}
 
 
 def main():
     args = parse_args()
-    log_info("Generating %d cities...", args.n_cities)
-    cities = generate_cities(args.n_cities, args.min_coord, args.max_coord)
+    if args.output_fp.suffix not in WRITERS:
+        raise ValueError(f"Unsupported output format: {args.output_fp.suffix}")
+    log_info("Generating %d cities with the %s layout...", args.n_cities, args.layout)
+    generator = CityGenerator(
+        args.n_cities,
+        args.min_coord,
+        args.max_coord,
+        args.layout,
+        np.random.default_rng(args.seed),
+        n_clusters=args.n_clusters,
+        cluster_std=args.cluster_std,
+        grid_jitter=args.grid_jitter,
+    )
     log_info("Saving cities to %s", args.output_fp)
-    save_cities(cities, args.output_fp)
+    WRITERS[args.output_fp.suffix](generator, args.output_fp, args.chunk_size)
 
 
 if __name__ == "__main__":
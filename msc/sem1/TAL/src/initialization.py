@@ -0,0 +1,152 @@
+import numpy as np
+
+from .local_search import nearest_neighbours
+
+
+def random_population(n_population, n_cities, rng):
+    """Generating a population of independent random permutations
+
+    Args:
+        n_population: Number of individuals
+        n_cities: Number of cities
+        rng: NumPy random generator
+
+    Returns:
+        int32 array of shape (n_population, n_cities)
+    """
+    population = np.broadcast_to(
+        np.arange(n_cities, dtype=np.int32), (n_population, n_cities)
+    )
+    return rng.permuted(population, axis=1)
+
+
+def nearest_neighbour_tour(distances, start):
+    """Building a tour by always moving to the closest unvisited city
+
+    Args:
+        distances: Distance matrix
+        start: First city of the tour
+
+    Returns:
+        int32 array of cities indices
+    """
+    n_cities = len(distances)
+    visited = np.zeros(n_cities, dtype=bool)
+    tour = np.empty(n_cities, dtype=np.int32)
+    tour[0] = city = start
+    visited[start] = True
+    for i in range(1, n_cities):
+        city = np.argmin(np.where(visited, np.inf, distances[city]))
+        tour[i] = city
+        visited[city] = True
+    return tour
+
+
+def greedy_edge_tour(distances, n_neighbours=10):
+    """Building a tour by adding the shortest edges that keep every city \
+        with at most two edges and do not close a cycle early, candidate edges \
+        come from the nearest neighbours lists and the remaining fragments \
+        are joined by their closest free ends
+
+    Args:
+        distances: Distance matrix
+        n_neighbours: Number of nearest neighbours giving the candidate edges
+
+    Returns:
+        int32 array of cities indices
+    """
+    n_cities = len(distances)
+    if n_cities < 3:
+        return np.arange(n_cities, dtype=np.int32)
+    neighbours = nearest_neighbours(distances, n_neighbours)
+    starts = np.repeat(np.arange(n_cities), neighbours.shape[1])
+    ends = neighbours.ravel()
+    order = np.argsort(distances[starts, ends], kind="stable")
+
+    adjacency = [[] for _ in range(n_cities)]
+    fragment = list(range(n_cities))
+
+    def find(city):
+        while fragment[city] != city:
+            fragment[city] = fragment[fragment[city]]
+            city = fragment[city]
+        return city
+
+    def link(city_1, city_2):
+        adjacency[city_1].append(city_2)
+        adjacency[city_2].append(city_1)
+        fragment[find(city_1)] = find(city_2)
+
+    n_edges = 0
+    for city_1, city_2 in zip(starts[order].tolist(), ends[order].tolist()):
+        if len(adjacency[city_1]) < 2 and len(adjacency[city_2]) < 2:
+            if find(city_1) != find(city_2):
+                link(city_1, city_2)
+                n_edges += 1
+
+    free_ends = [city for city in range(n_cities) if len(adjacency[city]) < 2]
+    while n_edges < n_cities - 1:
+        city_1 = free_ends[0]
+        candidates = [city for city in free_ends if find(city) != find(city_1)]
+        city_2 = min(candidates, key=lambda city: distances[city_1, city])
+        link(city_1, city_2)
+        n_edges += 1
+        free_ends = [city for city in free_ends if len(adjacency[city]) < 2]
+
+    tour = np.empty(n_cities, dtype=np.int32)
+    prev, city = -1, free_ends[0]
+    for i in range(n_cities):
+        tour[i] = city
+        prev, city = city, next(
+            (neighbour for neighbour in adjacency[city] if neighbour != prev), -1
+        )
+    return tour
+
+
+def double_bridge(tour, rng):
+    """Perturbing a tour with a random double-bridge move
+
+    Args:
+        tour: Array of cities indices
+        rng: NumPy random generator
+
+    Returns:
+        Perturbed tour
+    """
+    if len(tour) < 8:
+        return rng.permutation(tour)
+    a, b, c = np.sort(rng.choice(np.arange(1, len(tour)), size=3, replace=False))
+    return np.concatenate((tour[:a], tour[c:], tour[b:c], tour[a:b]))
+
+
+def seeded_population(distances, n_seeded, method, rng):
+    """Generating individuals from a construction heuristic
+
+    Nearest neighbour tours start from distinct random cities, as long as
+    there are enough cities. Greedy edge gives a single tour, the rest
+    of the seeded individuals are its double-bridge perturbations.
+
+    Args:
+        distances: Distance matrix
+        n_seeded: Number of individuals
+        method: "nearest_neighbour" or "greedy_edge"
+        rng: NumPy random generator
+
+    Returns:
+        int32 array of shape (n_seeded, n_cities)
+    """
+    n_cities = len(distances)
+    population = np.empty((n_seeded, n_cities), dtype=np.int32)
+    if n_seeded == 0:
+        return population
+    if method == "nearest_neighbour":
+        starts = rng.choice(n_cities, size=n_seeded, replace=n_seeded > n_cities)
+        for i, start in enumerate(starts):
+            population[i] = nearest_neighbour_tour(distances, start)
+    elif method == "greedy_edge":
+        population[0] = greedy_edge_tour(distances)
+        for i in range(1, n_seeded):
+            population[i] = double_bridge(population[0], rng)
+    else:
+        raise ValueError(f"Unknown seeding method: {method}")
+    return population
@@ -0,0 +1,220 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+
+import numpy as np
+
+from .config import Config
+from .distances import CoordinateDistances, build_distances
+from .metrics import MetricsLogger, generation_stats
+from .shared_array import attach_shared_array, share_array
+from .trainer import GeneticTrainer
+from .utils import log_info, pool_context
+
+# Trainer of the worker process and its shared distance matrix,
+# set once by `_init_island_worker`
+_WORKER_STATE = {}
+
+
+def _init_island_worker(config: Config, distances_spec):
+    """Creating the trainer of a worker process on the shared distance matrix \
+        attached read-only
+
+    Args:
+        config: Config object
+        distances_spec: Name, shape and dtype of the shared distance matrix, \
+            None if the distances are computed on the fly
+    """
+    if distances_spec is not None:
+        _WORKER_STATE["distances_shm"], distances = attach_shared_array(
+            *distances_spec, readonly=True
+        )
+    else:
+        distances = CoordinateDistances(config.coords, config.distance_dtype)
+    _WORKER_STATE["trainer"] = GeneticTrainer(config, distances=distances)
+
+
+def _evolve_island(population, lengths, n_generations, seed):
+    """Evolving a single island in a worker process
+
+    Args:
+        population: Population of the island, None to draw the initial one
+        lengths: Tour lengths of the island, None to compute them
+        n_generations: Number of generations to evolve
+        seed: Seed of the RNGs of the worker for this island and epoch
+
+    Returns:
+        Population of the island after `n_generations` and its tour lengths
+    """
+    np.random.seed(seed)
+    random.seed(seed)
+    if population is None:
+        population = _WORKER_STATE["trainer"].initial_population()
+    if lengths is None:
+        lengths = _WORKER_STATE["trainer"].total_dist_population(population)
+    for _ in range(n_generations):
+        population, lengths = _WORKER_STATE["trainer"].next_generation(
+            population, lengths
+        )
+    return population, lengths
+
+
+class IslandTrainer:
+    """Island model of the genetic algorithm, every island is evolved \
+        in a separate process and the islands exchange their best individuals \
+        every `config.migration_interval` generations
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        # The matrix of the main trainer is copied to shared memory by `fit`
+        self.trainer = GeneticTrainer(
+            config, distances=build_distances(config, n_copies=2)
+        )
+
+    def fit(self, stop_threshold: float = 0.0, record: bool = True):
+        """Running the island model of the genetic algorithm
+
+        The distance matrix is published once in shared memory and attached
+        read-only by the workers, which compute the distances on the fly
+        instead when the matrix is too large. The islands send back their
+        tour lengths with their populations, which feed the statistics,
+        the early stopping and the migration, checked after every migration
+        interval. The best tour found after any epoch is kept, as the islands
+        may lose it in later generations.
+
+        Args:
+            stop_threshold: Fitness at which the evolution is stopped
+            record: Whether to write the metrics, turned off for runs \
+                repeated only to measure them
+
+        Returns:
+            outputs: Dictionary containing the best individual, best fitness \
+                and number of generations run
+        """
+        start_time = time()
+        n_workers = min(self.config.n_islands, os.cpu_count() or 1)
+        islands = [None] * self.config.n_islands
+        islands_lengths = [None] * self.config.n_islands
+        n_generations_run = self.config.n_generations
+        best_individual = None
+        best_fitness = np.inf
+        # Every island draws the seed of each epoch from its own child of a seed
+        # sequence seeded by the main RNG, whichever worker evolves it
+        islands_seeds = np.random.SeedSequence(
+            np.random.randint(np.iinfo(np.int32).max)
+        ).spawn(self.config.n_islands)
+        distances_shm = distances_spec = None
+        if isinstance(self.trainer.distances, np.ndarray):
+            distances_shm, shared_distances, distances_spec = share_array(
+                self.trainer.distances
+            )
+        metrics_logger = (
+            MetricsLogger(self.config.log_dir / "metrics.jsonl")
+            if record and self.config.metrics_interval > 0
+            else None
+        )
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_island_worker,
+                initargs=(self.config, distances_spec),
+                mp_context=pool_context(self.config.use_numba),
+            ) as executor:
+                for generation in range(
+                    0, self.config.n_generations, self.config.migration_interval
+                ):
+                    n_generations = min(
+                        self.config.migration_interval,
+                        self.config.n_generations - generation,
+                    )
+                    islands, islands_lengths = zip(
+                        *executor.map(
+                            _evolve_island,
+                            islands,
+                            islands_lengths,
+                            [n_generations] * len(islands),
+                            [
+                                int(seeds.spawn(1)[0].generate_state(1)[0])
+                                for seeds in islands_seeds
+                            ],
+                        )
+                    )
+                    lengths = np.concatenate(islands_lengths)
+                    best_island = int(
+                        np.argmin(
+                            [island_lengths.min() for island_lengths in islands_lengths]
+                        )
+                    )
+                    fitness = float(islands_lengths[best_island].min())
+                    if fitness < best_fitness:
+                        best_individual = islands[best_island][
+                            islands_lengths[best_island].argmin()
+                        ].copy()
+                        best_fitness = fitness
+                    stats = generation_stats(
+                        generation + n_generations,
+                        lengths,
+                        best_fitness,
+                        time() - start_time,
+                    )
+                    if metrics_logger is not None:
+                        metrics_logger.log(stats)
+                    log_info(
+                        "Generation: %d, Best fitness: %.2f, Mean fitness: %.2f, "
+                        "Diversity: %.2f",
+                        stats["generation"],
+                        fitness,
+                        stats["mean_fitness"],
+                        stats["diversity"],
+                    )
+                    if best_fitness <= stop_threshold:
+                        log_info(
+                            "Stopping early as the stop threshold is reached at generation %d",
+                            generation + n_generations,
+                        )
+                        n_generations_run = generation + n_generations
+                        break
+                    self.migrate(islands, islands_lengths)
+        finally:
+            if metrics_logger is not None:
+                metrics_logger.close()
+            if distances_shm is not None:
+                del shared_distances
+                distances_shm.close()
+                distances_shm.unlink()
+
+        outputs = {
+            "best_individual": self.trainer.decode(best_individual),
+            "best_fitness": self.trainer.total_dist_individual(best_individual),
+            "n_generations": n_generations_run,
+        }
+        return outputs
+
+    def migrate(self, islands, islands_lengths):
+        """Replacing the worst individuals of every island in place \
+            with the best individuals of its neighbour in the topology
+
+        Args:
+            islands: List of islands populations
+            islands_lengths: List of islands tour lengths, updated in place
+        """
+        n_islands = len(islands)
+        n_migrants = self.config.migration_size
+        if n_islands < 2 or n_migrants == 0:
+            return
+        if self.config.migration_topology == "ring":
+            sources = (np.arange(n_islands) - 1) % n_islands
+        else:
+            shift = np.random.randint(1, n_islands, size=n_islands)
+            sources = (np.arange(n_islands) - shift) % n_islands
+
+        order = [np.argsort(lengths) for lengths in islands_lengths]
+        migrants = [island[o[:n_migrants]].copy() for island, o in zip(islands, order)]
+        migrants_lengths = [
+            lengths[o[:n_migrants]] for lengths, o in zip(islands_lengths, order)
+        ]
+        for island, lengths, o, source in zip(islands, islands_lengths, order, sources):
+            island[o[-n_migrants:]] = migrants[source]
+            lengths[o[-n_migrants:]] = migrants_lengths[source]
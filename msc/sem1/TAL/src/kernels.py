@@ -0,0 +1,305 @@
+import numpy as np
+
+from numba import njit, prange
+
+# Numba-compiled forms of the hot loops of the trainer, crossover, local search
+# and Held-Karp modules. The module is imported only when `use_numba` is set
+# and Numba is installed, otherwise the NumPy and Python implementations are used.
+
+_EPS = 1e-9
+
+
+@njit(parallel=True, cache=True)
+def tour_lengths(distances, population):
+    """Calculating the length of every tour of a population
+
+    Args:
+        distances: Distance matrix
+        population: Array of shape (n_individuals, n_cities) of cities indices
+
+    Returns:
+        Array of tour lengths, of the dtype of `distances`
+    """
+    n_individuals, n_cities = population.shape
+    lengths = np.empty(n_individuals, dtype=distances.dtype)
+    for i in prange(n_individuals):
+        length = 0.0
+        for k in range(n_cities - 1):
+            length += distances[population[i, k], population[i, k + 1]]
+        lengths[i] = length + distances[population[i, n_cities - 1], population[i, 0]]
+    return lengths
+
+
+@njit(parallel=True, cache=True)
+def segment_fill_batch(head_parents, tail_parents, starts, ends, tails_from):
+    """Compiled form of `crossover._segment_fill_batch`"""
+    n_pairs, n_cities = head_parents.shape
+    offspring = np.zeros_like(head_parents)
+    for i in prange(n_pairs):
+        used = np.zeros(n_cities, dtype=np.bool_)
+        for k in range(starts[i], ends[i]):
+            offspring[i, k] = head_parents[i, k]
+            used[head_parents[i, k]] = True
+        position = ends[i] % n_cities
+        for k in range(n_cities):
+            city = tail_parents[i, (k + tails_from[i]) % n_cities]
+            if not used[city]:
+                offspring[i, position] = city
+                position = (position + 1) % n_cities
+    return offspring
+
+
+@njit(cache=True)
+def _edges_length(distances, individual, edges, n_edges):
+    """Calculating the total length of the distinct edges among `edges[:n_edges]`"""
+    n_cities = len(individual)
+    length = 0.0
+    for e in range(n_edges):
+        duplicate = False
+        for f in range(e):
+            if edges[f] == edges[e]:
+                duplicate = True
+        if not duplicate:
+            k = edges[e]
+            length += distances[individual[k], individual[(k + 1) % n_cities]]
+    return length
+
+
+@njit(parallel=True, cache=True)
+def swap_mutation(population, lengths, distances, rows, index_pairs):
+    """Compiled form of `GeneticTrainer.mutation` applied to several rows, \
+        in place
+
+    Args:
+        population: Population of individuals
+        lengths: Tour lengths of the individuals
+        distances: Distance matrix
+        rows: Distinct rows to mutate
+        index_pairs: Array of shape (len(rows), 2) of swapped positions
+    """
+    n_cities = population.shape[1]
+    for r in prange(len(rows)):
+        row = rows[r]
+        index_1, index_2 = index_pairs[r, 0], index_pairs[r, 1]
+        edges = np.array(
+            [(index_1 - 1) % n_cities, index_1, (index_2 - 1) % n_cities, index_2]
+        )
+        length = lengths[row] - _edges_length(distances, population[row], edges, 4)
+        city = population[row, index_1]
+        population[row, index_1] = population[row, index_2]
+        population[row, index_2] = city
+        lengths[row] = length + _edges_length(distances, population[row], edges, 4)
+
+
+@njit(cache=True)
+def _reverse(tour, position, start, end):
+    """Compiled form of `local_search._reverse`"""
+    while start < end:
+        tour[start], tour[end] = tour[end], tour[start]
+        position[tour[start]] = start
+        position[tour[end]] = end
+        start += 1
+        end -= 1
+
+
+@njit(cache=True)
+def _two_opt_move(tour, position, distances, neighbours, i, changed):
+    """Compiled form of `local_search._two_opt_move`, \
+        the changed cities are written to `changed`
+
+    Returns:
+        Number of changed cities, 0 if there is no improving move
+    """
+    n_cities = len(tour)
+    for step in (1, -1):
+        a = tour[i]
+        b = tour[(i + step) % n_cities]
+        d_ab = distances[a, b]
+        for c in neighbours[a]:
+            d_ac = distances[a, c]
+            if d_ac >= d_ab:
+                break
+            j = position[c]
+            d = tour[(j + step) % n_cities]
+            if c == b or d == a:
+                continue
+            delta = d_ac + distances[b, d] - d_ab - distances[c, d]
+            if delta < -_EPS:
+                if step == 1:
+                    if i < j:
+                        _reverse(tour, position, i + 1, j)
+                    else:
+                        _reverse(tour, position, j + 1, i)
+                elif i < j:
+                    _reverse(tour, position, i, j - 1)
+                else:
+                    _reverse(tour, position, j, i - 1)
+                changed[0], changed[1], changed[2], changed[3] = a, b, c, d
+                return 4
+    return 0
+
+
+@njit(cache=True)
+def _best_insertion(tour, position, distances, neighbours, i, length, removal_gain):
+    """Compiled form of `local_search._best_insertion`
+
+    Returns:
+        Position of the city after which the segment is inserted \
+            and whether it is reversed, -1 if there is no improving insertion
+    """
+    n_cities = len(tour)
+    first, last = tour[i], tour[i + length - 1]
+    for side in range(2):
+        end, other_end = (first, last) if side == 0 else (last, first)
+        for c in neighbours[end]:
+            d_end_c = distances[end, c]
+            if d_end_c >= removal_gain:
+                break
+            j = position[c]
+            if i <= j < i + length:
+                continue
+            for left_pos in (j, j - 1):
+                left_pos %= n_cities
+                if left_pos == (i - 1) % n_cities or i <= left_pos < i + length:
+                    continue
+                left, right = tour[left_pos], tour[(left_pos + 1) % n_cities]
+                if left == c:
+                    cost = d_end_c + distances[other_end, right] - distances[c, right]
+                else:
+                    cost = distances[left, other_end] + d_end_c - distances[left, c]
+                if cost - removal_gain < -_EPS:
+                    return left_pos, (left == c) == (end == last)
+    return -1, False
+
+
+@njit(cache=True)
+def _or_opt_move(tour, position, distances, neighbours, i, changed):
+    """Compiled form of `local_search._or_opt_move`, \
+        the changed cities are written to `changed`
+
+    Returns:
+        Number of changed cities, 0 if there is no improving move
+    """
+    n_cities = len(tour)
+    for length in range(1, 4):
+        if n_cities < length + 3 or i + length > n_cities:
+            continue
+        first, last = tour[i], tour[i + length - 1]
+        prev, next_ = tour[i - 1], tour[(i + length) % n_cities]
+        removal_gain = (
+            distances[prev, first] + distances[last, next_] - distances[prev, next_]
+        )
+        if removal_gain <= _EPS:
+            continue
+        left_pos, reverse = _best_insertion(
+            tour, position, distances, neighbours, i, length, removal_gain
+        )
+        if left_pos < 0:
+            continue
+        left, right = tour[left_pos], tour[(left_pos + 1) % n_cities]
+        segment = tour[i : i + length].copy()
+        if reverse:
+            segment = segment[::-1].copy()
+        tour[i : n_cities - length] = tour[i + length :].copy()
+        insert_at = left_pos + 1 - (length if left_pos > i else 0)
+        tour[insert_at + length :] = tour[insert_at : n_cities - length].copy()
+        tour[insert_at : insert_at + length] = segment
+        for k in range(n_cities):
+            position[tour[k]] = k
+        changed[0], changed[1], changed[2] = first, last, prev
+        changed[3], changed[4], changed[5] = next_, left, right
+        return 6
+    return 0
+
+
+@njit(cache=True)
+def improve_tour(tour, distances, neighbours):
+    """Compiled form of `local_search.improve_tour`
+
+    Args:
+        tour: Array of cities indices, improved in place
+        distances: Distance matrix
+        neighbours: Array of nearest neighbours of every city, closest first
+    """
+    n_cities = len(tour)
+    if n_cities < 5:
+        return
+    position = np.empty(n_cities, dtype=np.int64)
+    for k in range(n_cities):
+        position[tour[k]] = k
+    active = np.empty(n_cities, dtype=np.int64)
+    active[:] = tour
+    is_active = np.ones(n_cities, dtype=np.bool_)
+    changed = np.empty(6, dtype=np.int64)
+    head, n_active = 0, n_cities
+    while n_active:
+        city = active[head]
+        head = (head + 1) % n_cities
+        n_active -= 1
+        is_active[city] = False
+        n_changed = _two_opt_move(
+            tour, position, distances, neighbours, position[city], changed
+        )
+        if n_changed == 0:
+            n_changed = _or_opt_move(
+                tour, position, distances, neighbours, position[city], changed
+            )
+        for k in range(n_changed):
+            if not is_active[changed[k]]:
+                is_active[changed[k]] = True
+                active[(head + n_active) % n_cities] = changed[k]
+                n_active += 1
+
+
+@njit(parallel=True, cache=True)
+def improve_tours(population, lengths, distances, neighbours, rows):
+    """Improving several rows of a population with `improve_tour` in place \
+        and updating their tour lengths
+
+    Args:
+        population: Population of individuals
+        lengths: Tour lengths of the individuals
+        distances: Distance matrix
+        neighbours: Array of nearest neighbours of every city, closest first
+        rows: Distinct rows to improve
+    """
+    n_cities = population.shape[1]
+    for r in prange(len(rows)):
+        tour = population[rows[r]]
+        improve_tour(tour, distances, neighbours)
+        length = 0.0
+        for k in range(n_cities):
+            length += distances[tour[k], tour[(k + 1) % n_cities]]
+        lengths[rows[r]] = length
+
+
+@njit(parallel=True, cache=True)
+def relax_masks(dp, parents, masks, rest_distances, record_parents):
+    """Compiled form of `tsp_dp._relax_masks`, looping over the set bits \
+        of every mask instead of materializing the candidate costs
+
+    Args:
+        dp: Held-Karp table
+        parents: uint8 table of predecessors, ignored if not `record_parents`
+        masks: Masks with the same number of set bits
+        rest_distances: Distances between all cities but the start one
+        record_parents: Whether to record the predecessors
+    """
+    n_rest = dp.shape[1]
+    for m in prange(len(masks)):
+        mask = masks[m]
+        for last in range(n_rest):
+            if not (mask >> last) & 1:
+                continue
+            prev_mask = mask ^ (1 << last)
+            best_cost = np.inf
+            best_prev = 0
+            for prev in range(n_rest):
+                if (prev_mask >> prev) & 1:
+                    cost = dp[prev_mask, prev] + rest_distances[prev, last]
+                    if cost < best_cost:
+                        best_cost = cost
+                        best_prev = prev
+            dp[mask, last] = best_cost
+            if record_parents:
+                parents[mask, last] = best_prev
@@ -0,0 +1,207 @@
+from collections import deque
+
+import numpy as np
+
+_EPS = 1e-9
+
+
+def nearest_neighbours(distances, n_neighbours, block_size=1 << 22):
+    """Finding the nearest neighbours of every city
+
+    Args:
+        distances: Distance matrix or `CoordinateDistances`
+        n_neighbours: Number of neighbours kept per city
+        block_size: Number of distances processed at once
+
+    Returns:
+        Array of shape (n_cities, n_neighbours) of neighbours, closest first
+    """
+    n_cities = len(distances)
+    n_neighbours = min(n_neighbours, n_cities - 1)
+    neighbours = np.empty((n_cities, n_neighbours), dtype=np.int32)
+    if n_neighbours <= 0:
+        return neighbours
+    n_rows = max(1, block_size // n_cities)
+    for start in range(0, n_cities, n_rows):
+        rows = np.arange(start, min(start + n_rows, n_cities))
+        block = np.array(distances[rows], dtype=np.float64)
+        block[np.arange(len(rows)), rows] = np.inf
+        candidates = np.argpartition(block, n_neighbours - 1, axis=1)[:, :n_neighbours]
+        order = np.argsort(np.take_along_axis(block, candidates, axis=1), axis=1)
+        neighbours[rows] = np.take_along_axis(candidates, order, axis=1)
+    return neighbours
+
+
+def _reverse(tour, position, start, end):
+    """Reversing `tour[start:end + 1]` in place and updating the positions
+
+    Args:
+        tour: List of cities indices
+        position: List of positions of every city in `tour`
+        start: First position of the reversed segment
+        end: Last position of the reversed segment
+    """
+    tour[start : end + 1] = tour[start : end + 1][::-1]
+    for i in range(start, end + 1):
+        position[tour[i]] = i
+
+
+def _two_opt_move(tour, position, distances, neighbours, i):
+    """Applying the first improving 2-opt move replacing an edge of `tour[i]` \
+        with an edge towards one of its nearest neighbours
+
+    Args:
+        tour: List of cities indices
+        position: List of positions of every city in `tour`
+        distances: Distance matrix
+        neighbours: Lists of nearest neighbours of every city, closest first
+        i: Position of the city
+
+    Returns:
+        Cities whose edges changed, None if there is no improving move
+    """
+    n_cities = len(tour)
+    for step in (1, -1):
+        a = tour[i]
+        b = tour[(i + step) % n_cities]
+        d_ab = distances[a, b]
+        for c in neighbours[a]:
+            d_ac = distances[a, c]
+            if d_ac >= d_ab:
+                break
+            j = position[c]
+            d = tour[(j + step) % n_cities]
+            if c == b or d == a:
+                continue
+            delta = d_ac + distances[b, d] - d_ab - distances[c, d]
+            if delta < -_EPS:
+                if step == 1:
+                    start, end = (i + 1, j) if i < j else (j + 1, i)
+                else:
+                    start, end = (i, j - 1) if i < j else (j, i - 1)
+                _reverse(tour, position, start, end)
+                return a, b, c, d
+    return None
+
+
+def _or_opt_move(tour, position, distances, neighbours, i, segment_lengths=(1, 2, 3)):
+    """Applying the first improving Or-opt move of a segment starting at `tour[i]` \
+        next to one of the nearest neighbours of its ends
+
+    Args:
+        tour: List of cities indices
+        position: List of positions of every city in `tour`
+        distances: Distance matrix
+        neighbours: Lists of nearest neighbours of every city, closest first
+        i: Position of the first city of the segment
+        segment_lengths: Lengths of the moved segments
+
+    Returns:
+        Cities whose edges changed, None if there is no improving move
+    """
+    n_cities = len(tour)
+    for length in segment_lengths:
+        if n_cities < length + 3 or i + length > n_cities:
+            continue
+        first, last = tour[i], tour[i + length - 1]
+        prev, next_ = tour[i - 1], tour[(i + length) % n_cities]
+        removal_gain = (
+            distances[prev, first] + distances[last, next_] - distances[prev, next_]
+        )
+        if removal_gain <= _EPS:
+            continue
+        move = _best_insertion(
+            tour, position, distances, neighbours, i, length, removal_gain
+        )
+        if move is None:
+            continue
+        left, right, reverse = move
+        segment = tour[i : i + length]
+        if reverse:
+            segment.reverse()
+        del tour[i : i + length]
+        insert_at = tour.index(left) + 1
+        tour[insert_at:insert_at] = segment
+        for j, city in enumerate(tour):
+            position[city] = j
+        return first, last, prev, next_, left, right
+    return None
+
+
+def _best_insertion(tour, position, distances, neighbours, i, length, removal_gain):
+    """Finding an improving insertion of the segment starting at `i` \
+        which connects one of its ends to one of that end's nearest neighbours
+
+    Args:
+        tour: List of cities indices
+        position: List of positions of every city in `tour`
+        distances: Distance matrix
+        neighbours: Lists of nearest neighbours of every city, closest first
+        i: Position of the first city of the segment
+        length: Length of the segment
+        removal_gain: Decrease of the tour length after removing the segment
+
+    Returns:
+        Cities between which the segment is inserted and whether it is reversed, \
+            None if there is no improving insertion
+    """
+    n_cities = len(tour)
+    first, last = tour[i], tour[i + length - 1]
+    for end, other_end in ((first, last), (last, first)):
+        for c in neighbours[end]:
+            d_end_c = distances[end, c]
+            if d_end_c >= removal_gain:
+                break
+            j = position[c]
+            if i <= j < i + length:
+                continue
+            for left_pos in (j, j - 1):
+                left_pos %= n_cities
+                if left_pos == (i - 1) % n_cities or i <= left_pos < i + length:
+                    continue
+                left, right = tour[left_pos], tour[(left_pos + 1) % n_cities]
+                if left == c:
+                    cost = d_end_c + distances[other_end, right] - distances[c, right]
+                else:
+                    cost = distances[left, other_end] + d_end_c - distances[left, c]
+                if cost - removal_gain < -_EPS:
+                    return left, right, (left == c) == (end == last)
+    return None
+
+
+def improve_tour(tour, distances, neighbours):
+    """Applying 2-opt and Or-opt moves to a tour until neither improves it
+
+    Cities are processed from a queue of active cities (don't-look bits),
+    a city leaves the queue when no move around it improves the tour and
+    comes back when one of its edges is changed by another move.
+
+    Args:
+        tour: Array of cities indices
+        distances: Distance matrix
+        neighbours: Lists of nearest neighbours of every city, closest first
+
+    Returns:
+        Improved tour
+    """
+    if len(tour) < 5:
+        return tour
+    improved_tour = tour.tolist()
+    position = np.argsort(tour).tolist()
+    active = deque(improved_tour)
+    is_active = [True] * len(improved_tour)
+    while active:
+        city = active.popleft()
+        is_active[city] = False
+        changed = _two_opt_move(
+            improved_tour, position, distances, neighbours, position[city]
+        ) or _or_opt_move(
+            improved_tour, position, distances, neighbours, position[city]
+        )
+        if changed is None:
+            continue
+        for changed_city in changed:
+            if not is_active[changed_city]:
+                is_active[changed_city] = True
+                active.append(changed_city)
+    return np.array(improved_tour, dtype=tour.dtype)
@@ -1,14 +1,14 @@
 import argparse
 import math
 from pathlib import Path
-from time import time
-
-from memory_profiler import memory_usage
 
 from .config import Config
+from .island import IslandTrainer
+from .profiling import Profiler
 from .trainer import GeneticTrainer
-from .tsp_dp import tsp_dynamic_programming
-from .utils import log_info
+from .tsp_bnb import tsp_branch_and_bound
+from .tsp_dp import tsp_dynamic_programming, tsp_dynamic_programming_parallel
+from .utils import edge_overlap, log_info
 
 
 def parse_args():
@@ -27,40 +27,164 @@ def parse_args():
         default=Path("configs/hparams.json"),
         help="Path to the JSON file containing the hyperparameters",
     )
+    parser.add_argument(
+        "--exact_solver",
+        choices=("dynamic_programming", "branch_and_bound"),
+        default="dynamic_programming",
+        help="Exact algorithm giving the optimal tour, branch-and-bound runs "
+        "after the genetic algorithm and starts from its best tour",
+    )
+    parser.add_argument(
+        "--max_nodes",
+        type=int,
+        default=None,
+        help="Maximum number of nodes explored by branch-and-bound",
+    )
+    parser.add_argument(
+        "--dp_workers",
+        type=int,
+        default=1,
+        help="Number of processes of the dynamic programming algorithm",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every phase of the genetic algorithm",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Dump cProfile stats of every solver run to the log directory",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Measure the peak memory of every solver run in a separate run "
+        "under tracemalloc, which is too slow to be timed",
+    )
+    parser.add_argument(
+        "--resume",
+        type=Path,
+        default=None,
+        help="Path to a checkpoint of the genetic algorithm to resume from",
+    )
     return parser.parse_args()
 
 
-def fn_with_memory_time_profiling(fn, *args, **kwargs):
-    start_time = time()
-    mem_usage, result = memory_usage((fn, args, kwargs), retval=True)
-    end_time = time()
-    return result, end_time - start_time, mem_usage
-
+def run_dynamic_programming(args, config, profiler):
+    """Running the dynamic programming algorithm
 
-def main():
-    args = parse_args()
-    config = Config.from_files(args.hparams_fp, args.cities_fp)
+    Args:
+        args: Command line arguments
+        config: Config
+        profiler: Profiler of the solvers
 
-    log_info("Number of cities: %d", len(config.cities))
+    Returns:
+        Minimum cost and optimal tour
+    """
     log_info("Starting the dynamic programming algorithm...")
-    min_cost, run_time, mem_usage = fn_with_memory_time_profiling(
-        tsp_dynamic_programming, config.city_coords
-    )
+    if args.dp_workers > 1:
+        (min_cost, optimal_tour), run_time, peak_memory = profiler.run(
+            "dynamic_programming",
+            tsp_dynamic_programming_parallel,
+            config.city_coords,
+            n_workers=args.dp_workers,
+            return_tour=True,
+        )
+    else:
+        (min_cost, optimal_tour), run_time, peak_memory = profiler.run(
+            "dynamic_programming",
+            tsp_dynamic_programming,
+            config.city_coords,
+            return_tour=True,
+            use_numba=config.use_numba,
+        )
+    log_info("Optimal tour: %s", optimal_tour)
     log_info("Minimum cost using dynamic programming: %.2f", min_cost)
     log_info("Dynamic programming time taken: %.2f seconds", run_time)
-    log_info(
-        "Dynamic programming memory usage: %.6f MB", max(mem_usage) - min(mem_usage)
+    if peak_memory is not None:
+        log_info("Dynamic programming memory usage: %.6f MB", peak_memory)
+    return min_cost, optimal_tour
+
+
+def run_branch_and_bound(args, config, profiler, initial_tour):
+    """Running the branch-and-bound algorithm
+
+    Args:
+        args: Command line arguments
+        config: Config
+        profiler: Profiler of the solvers
+        initial_tour: Tour giving the first upper bound
+
+    Returns:
+        Minimum cost and optimal tour
+    """
+    log_info("Starting the branch-and-bound algorithm...")
+    (min_cost, optimal_tour), run_time, peak_memory = profiler.run(
+        "branch_and_bound",
+        tsp_branch_and_bound,
+        config.city_coords,
+        initial_tour=initial_tour,
+        return_tour=True,
+        max_nodes=args.max_nodes,
     )
+    log_info("Optimal tour: %s", optimal_tour)
+    log_info("Minimum cost using branch-and-bound: %.2f", min_cost)
+    log_info("Branch-and-bound time taken: %.2f seconds", run_time)
+    if peak_memory is not None:
+        log_info("Branch-and-bound memory usage: %.6f MB", peak_memory)
+    return min_cost, optimal_tour
+
 
-    log_info("Starting the genetic algorithm...")
-    trainer = GeneticTrainer(config)
-    outputs, run_time, mem_usage = fn_with_memory_time_profiling(
-        trainer.fit, stop_threshold=math.ceil(min_cost)
+def main():
+    args = parse_args()
+    config = Config.from_files(args.hparams_fp, args.cities_fp)
+    profiler = Profiler(
+        config.log_dir,
+        phases=args.profile,
+        cprofile=args.cprofile,
+        memory=args.memory,
+    )
+
+    log_info("Number of cities: %d", config.n_cities)
+    fit_kwargs = {}
+    if args.exact_solver == "dynamic_programming":
+        min_cost, optimal_tour = run_dynamic_programming(args, config, profiler)
+        fit_kwargs["stop_threshold"] = math.ceil(min_cost)
+
+    if config.n_islands > 1:
+        if args.resume is not None:
+            raise ValueError("Resuming is supported for a single island only")
+        log_info("Starting the genetic algorithm on %d islands...", config.n_islands)
+        trainer = IslandTrainer(config)
+    else:
+        log_info("Starting the genetic algorithm...")
+        trainer = GeneticTrainer(config, profiler=profiler)
+        fit_kwargs["resume_fp"] = args.resume
+    outputs, run_time, peak_memory = profiler.run(
+        "genetic_algorithm", trainer.fit, traced_kwargs={"record": False}, **fit_kwargs
     )
     log_info("Best individual: %s", outputs["best_individual"])
     log_info("Minimum cost using genetic algorithm: %.2f", outputs["best_fitness"])
     log_info("Genetic algorithm time taken: %.2f seconds", run_time)
-    log_info("Genetic algorithm memory usage: %.6f MB", max(mem_usage) - min(mem_usage))
+    if peak_memory is not None:
+        log_info("Genetic algorithm memory usage: %.6f MB", peak_memory)
+
+    if args.exact_solver == "branch_and_bound":
+        min_cost, optimal_tour = run_branch_and_bound(
+            args, config, profiler, outputs["best_individual"]
+        )
+    log_info(
+        "Edge overlap with the optimal tour: %.2f%%",
+        100 * edge_overlap(outputs["best_individual"], optimal_tour),
+    )
+    log_info(
+        "Optimality gap of the genetic algorithm: %.2f%%",
+        100 * (outputs["best_fitness"] - min_cost) / min_cost if min_cost else 0.0,
+    )
+    if args.profile:
+        profiler.log_phases()
+    profiler.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+def generation_stats(generation, lengths, best_fitness, run_time):
+    """Summarizing the tour lengths of a generation
+
+    Args:
+        generation: Generation number
+        lengths: Tour lengths of the population
+        best_fitness: Fitness of the best individual found so far
+        run_time: Time since the start of the run in seconds
+
+    Returns:
+        Dictionary of statistics, the diversity is the fraction of distinct \
+            tour lengths, a cheap proxy of the fraction of distinct tours
+    """
+    return {
+        "generation": generation,
+        "best_fitness": float(lengths.min()),
+        "mean_fitness": float(lengths.mean()),
+        "std_fitness": float(lengths.std()),
+        "best_so_far": best_fitness,
+        "diversity": len(np.unique(lengths)) / len(lengths),
+        "run_time": run_time,
+    }
+
+
+class MetricsLogger:
+    """Streaming statistics to a JSONL file, one line per logged generation, \
+        flushed line by line so that the file can be followed during the run. \
+        When resuming, the lines of `previous_fp` before `start_generation` \
+        are copied first
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        start_generation: int = 0,
+        previous_fp: Path | None = None,
+    ):
+        lines = []
+        if previous_fp is not None and previous_fp.exists():
+            lines = [
+                line
+                for line in previous_fp.read_text().splitlines()
+                if json.loads(line)["generation"] < start_generation
+            ]
+        self.file = open(file_path, "w", encoding="utf-8", buffering=1)
+        self.file.writelines(line + "\n" for line in lines)
+
+    def log(self, stats):
+        """Appending the statistics of a generation
+
+        Args:
+            stats: Dictionary returned by `generation_stats`
+        """
+        self.file.write(json.dumps(stats) + "\n")
+
+    def close(self):
+        """Closing the file"""
+        self.file.close()
@@ -0,0 +1,165 @@
+import cProfile
+import logging
+import json
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+
+from .checkpoint import rng_state, set_rng_state
+from .utils import log_info
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Collecting run time of solver runs and, when enabled, their peak memory, \
+        time spent in every phase of the genetic algorithm and cProfile dumps
+    """
+
+    def __init__(
+        self,
+        log_dir: Path | None = None,
+        phases: bool = False,
+        cprofile: bool = False,
+        memory: bool = False,
+    ):
+        self.log_dir = log_dir
+        self.phases = phases
+        self.cprofile = cprofile
+        self.memory = memory
+        self.runs = {}
+        self.phase_times = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+
+    def phase(self, name: str):
+        """Context manager timing a phase, a no-op when phases are disabled
+
+        Args:
+            name: Name of the phase
+
+        Returns:
+            Context manager
+        """
+        if not self.phases:
+            return _NULL_CONTEXT
+        return self._timed_phase(name)
+
+    @contextmanager
+    def _timed_phase(self, name):
+        """Timing a phase and adding the time to its total"""
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += perf_counter() - start_time
+            self.phase_calls[name] += 1
+
+    def run(self, name: str, fn, *args, traced_kwargs: dict | None = None, **kwargs):
+        """Running a function and timing it, under cProfile if enabled
+
+        Allocation tracing slows the traced code down several times, so the
+        timed run is never traced. When memory is enabled, the function is run
+        a second time under tracemalloc, from the same RNG states, without
+        the phase timers and info logs and with `traced_kwargs` turning off its
+        other outputs, and the global RNGs are then put back in the state left
+        by the timed run.
+
+        Args:
+            name: Name of the run
+            fn: Function to run
+            args: Positional arguments of the function
+            traced_kwargs: Keyword arguments added to the traced run only
+            kwargs: Keyword arguments of the function
+
+        Returns:
+            result: Result of the timed run
+            run_time: Run time in seconds
+            peak_memory: Peak memory allocated during the run in MB, \
+                None if memory is disabled
+        """
+        start_state = rng_state() if self.memory else None
+        profile = cProfile.Profile() if self.cprofile else None
+        start_time = perf_counter()
+        if profile is not None:
+            result = profile.runcall(fn, *args, **kwargs)
+        else:
+            result = fn(*args, **kwargs)
+        run_time = perf_counter() - start_time
+        peak_memory = (
+            self._peak_memory(start_state, fn, *args, **kwargs, **(traced_kwargs or {}))
+            if self.memory
+            else None
+        )
+
+        self.runs[name] = {"time": run_time, "peak_memory_mb": peak_memory}
+        if profile is not None and self.log_dir is not None:
+            profile.dump_stats(self.log_dir / f"{name}.prof")
+        return result, run_time, peak_memory
+
+    def _peak_memory(self, start_state, fn, *args, **kwargs):
+        """Running a function again under tracemalloc to measure its peak memory
+
+        Args:
+            start_state: States of the global RNGs before the timed run
+            fn: Function to run
+            args: Positional arguments of the function
+            kwargs: Keyword arguments of the function
+
+        Returns:
+            Peak memory allocated during the run in MB
+        """
+        end_state = rng_state()
+        set_rng_state(start_state)
+        phases, self.phases = self.phases, False
+        logging.disable(logging.INFO)
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        try:
+            fn(*args, **kwargs)
+            return (tracemalloc.get_traced_memory()[1] - start_memory) / 2**20
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+            self.phases = phases
+            logging.disable(logging.NOTSET)
+            set_rng_state(end_state)
+
+    def summary(self):
+        """Summarizing the runs and phases
+
+        Returns:
+            Dictionary with runs and phases statistics
+        """
+        phases = {
+            name: {
+                "time": self.phase_times[name],
+                "calls": self.phase_calls[name],
+                "mean_time": self.phase_times[name] / self.phase_calls[name],
+            }
+            for name in sorted(self.phase_times, key=self.phase_times.get, reverse=True)
+        }
+        return {"runs": self.runs, "phases": phases}
+
+    def log_phases(self):
+        """Logging the time spent in every phase, longest first"""
+        total_time = sum(self.phase_times.values())
+        for name, stats in self.summary()["phases"].items():
+            log_info(
+                "Phase %s: %.3f seconds (%.1f%%) in %d calls",
+                name,
+                stats["time"],
+                100 * stats["time"] / total_time,
+                stats["calls"],
+            )
+
+    def save(self):
+        """Saving the summary to `profile.json` in the log directory"""
+        if self.log_dir is not None:
+            (self.log_dir / "profile.json").write_text(
+                json.dumps(self.summary(), indent=2)
+            )
@@ -0,0 +1,79 @@
+from functools import partial
+
+import numpy as np
+
+
+def roulette_wheel(fitness_probs, n_parents):
+    """Roulette wheel proportionate selection of all parents at once
+
+    Args:
+        fitness_probs: Population fitness probability
+        n_parents: Number of parents to select
+
+    Returns:
+        Indices of the selected individuals
+    """
+    fitness_probs_cumsum = np.cumsum(fitness_probs)
+    draws = np.random.uniform(0, fitness_probs_cumsum[-1], n_parents)
+    selected = np.searchsorted(fitness_probs_cumsum, draws, side="right")
+    return np.minimum(selected, len(fitness_probs) - 1)
+
+
+def stochastic_universal_sampling(fitness_probs, n_parents):
+    """Stochastic universal sampling, a roulette wheel with evenly spaced pointers
+
+    Args:
+        fitness_probs: Population fitness probability
+        n_parents: Number of parents to select
+
+    Returns:
+        Indices of the selected individuals in random order
+    """
+    if n_parents == 0:
+        return np.empty(0, dtype=np.intp)
+    fitness_probs_cumsum = np.cumsum(fitness_probs)
+    step = fitness_probs_cumsum[-1] / n_parents
+    pointers = np.random.uniform(0, step) + step * np.arange(n_parents)
+    selected = np.searchsorted(fitness_probs_cumsum, pointers, side="right")
+    selected = np.minimum(selected, len(fitness_probs) - 1)
+    np.random.shuffle(selected)
+    return selected
+
+
+def tournament(fitness_probs, n_parents, tournament_size=3):
+    """Tournament selection, each parent is the fittest of a random group
+
+    Args:
+        fitness_probs: Population fitness probability
+        n_parents: Number of parents to select
+        tournament_size: Number of individuals competing in each tournament
+
+    Returns:
+        Indices of the selected individuals
+    """
+    candidates = np.random.randint(
+        0, len(fitness_probs), size=(n_parents, tournament_size)
+    )
+    winners = np.argmax(fitness_probs[candidates], axis=1)
+    return candidates[np.arange(n_parents), winners]
+
+
+SELECTION_OPERATORS = {
+    "roulette_wheel": roulette_wheel,
+    "stochastic_universal_sampling": stochastic_universal_sampling,
+    "tournament": tournament,
+}
+
+
+def get_selection_operator(config):
+    """Getting the selection operator configured in the config
+
+    Args:
+        config: Config object
+
+    Returns:
+        Function mapping (fitness_probs, n_parents) to selected indices
+    """
+    if config.selection == "tournament":
+        return partial(tournament, tournament_size=config.tournament_size)
+    return SELECTION_OPERATORS[config.selection]
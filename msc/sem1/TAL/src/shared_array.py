@@ -0,0 +1,55 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def create_shared_array(shape, dtype):
+    """Allocating a NumPy array in a new shared memory block
+
+    Args:
+        shape: Shape of the array
+        dtype: Data type of the array
+
+    Returns:
+        shm: Shared memory block, to be closed and unlinked by the caller
+        array: Array backed by the shared memory block
+    """
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def share_array(array):
+    """Copying an array to a new shared memory block
+
+    Args:
+        array: Array to share
+
+    Returns:
+        shm: Shared memory block, to be closed and unlinked by the caller
+        array: Array backed by the shared memory block
+        spec: Name, shape and dtype of the array, passed to `attach_shared_array`
+    """
+    shm, shared = create_shared_array(array.shape, array.dtype)
+    shared[:] = array
+    return shm, shared, (shm.name, shared.shape, shared.dtype)
+
+
+def attach_shared_array(name, shape, dtype, readonly=False):
+    """Attaching to a NumPy array created with `create_shared_array`
+
+    Args:
+        name: Name of the shared memory block
+        shape: Shape of the array
+        dtype: Data type of the array
+        readonly: Whether the returned array is read-only
+
+    Returns:
+        shm: Shared memory block, to be kept alive as long as the array is used
+        array: Array backed by the shared memory block
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = not readonly
+    return shm, array
@@ -0,0 +1,288 @@
+import argparse
+import itertools
+import json
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from .benchmark import save_results
+from .config import Config
+from .distances import build_shared_distances
+from .profiling import Profiler
+from .shared_array import attach_shared_array
+from .trainer import GeneticTrainer
+from .utils import log_info, pool_context
+
+# Base config and shared distance matrix of a worker process,
+# set by `_init_sweep_worker`
+_WORKER_STATE = {}
+
+# Overrides changing the cities, for which the views cached by the worker
+# are not reused, and the distances, for which runs build their own
+_CITIES_FIELDS = {"cities", "cities_fp"}
+_DISTANCES_FIELDS = _CITIES_FIELDS | {"distance_dtype", "max_distance_matrix_mb"}
+
+RESULT_FIELDNAMES = [
+    "best_fitness",
+    "n_generations",
+    "ga_time",
+    "time_to_threshold",
+    "peak_memory_mb",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Hyperparameter sweep of the genetic algorithm"
+    )
+    parser.add_argument(
+        "--cities_fp",
+        type=Path,
+        default=Path("configs/cities.tsv"),
+        help="Path to the cities file",
+    )
+    parser.add_argument(
+        "--hparams_fp",
+        type=Path,
+        default=Path("configs/hparams.json"),
+        help="Path to the JSON file containing the base hyperparameters",
+    )
+    parser.add_argument(
+        "--sweep_fp",
+        type=Path,
+        default=Path("configs/sweep.json"),
+        help="Path to the JSON file containing the sweep specification",
+    )
+    parser.add_argument(
+        "--n_workers",
+        type=int,
+        default=None,
+        help="Number of worker processes, all cores if not set",
+    )
+    parser.add_argument(
+        "--stop_threshold",
+        type=float,
+        default=0.0,
+        help="Fitness at which a run is stopped, used for the time to threshold",
+    )
+    parser.add_argument(
+        "--output_fp",
+        type=Path,
+        default=Path("sweep_results.csv"),
+        help="Path to the CSV or JSON results file",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Measure the peak memory of every run in a separate run "
+        "under tracemalloc, which is too slow to be timed",
+    )
+    return parser.parse_args()
+
+
+def sweep_configurations(sweep, rng):
+    """Expanding a sweep specification into hyperparameters overrides
+
+    The specification holds a `grid` of lists of values, whose cartesian
+    product is taken, and `random` ranges `[low, high]` sampled `n_samples`
+    times for every grid point, as integers if both bounds are integers.
+
+    Args:
+        sweep: Sweep specification
+        rng: NumPy random generator
+
+    Returns:
+        List of dictionaries of hyperparameters overriding the base config
+    """
+    grid = sweep.get("grid", {})
+    ranges = sweep.get("random", {})
+    unknown = (grid.keys() | ranges.keys()) - Config.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters: {sorted(unknown)}")
+    n_samples = sweep.get("n_samples", 1) if ranges else 1
+
+    configurations = []
+    for values in itertools.product(*grid.values()):
+        for _ in range(n_samples):
+            overrides = dict(zip(grid, values))
+            for name, (low, high) in ranges.items():
+                if isinstance(low, int) and isinstance(high, int):
+                    overrides[name] = int(rng.integers(low, high + 1))
+                else:
+                    overrides[name] = float(rng.uniform(low, high))
+            configurations.append(overrides)
+    return configurations
+
+
+def _init_sweep_worker(config: Config, distances_spec):
+    """Keeping the base config and attaching the shared distance matrix read-only
+
+    Args:
+        config: Base config
+        distances_spec: Name, shape and dtype of the shared distance matrix, \
+            None if the distances are computed on the fly
+    """
+    _WORKER_STATE["config"] = config
+    _WORKER_STATE["distances"] = None
+    if distances_spec is not None:
+        (
+            _WORKER_STATE["distances_shm"],
+            _WORKER_STATE["distances"],
+        ) = attach_shared_array(*distances_spec, readonly=True)
+
+
+def _run_sweep(run_id, overrides, seed, stop_threshold, memory=False):
+    """Running the genetic algorithm with a single set of hyperparameters, \
+        logging to its own subdirectory of the base `log_dir`
+
+    Args:
+        run_id: Number of the run
+        overrides: Hyperparameters overriding the base config
+        seed: Seed of the run
+        stop_threshold: Fitness at which the run is stopped
+        memory: Whether to measure the peak memory of the run
+
+    Returns:
+        Results row
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    base_config = _WORKER_STATE["config"]
+    config = Config.model_validate(
+        {
+            **base_config.model_dump(),
+            **overrides,
+            "log_dir": base_config.log_dir / f"run_{run_id}",
+        },
+        context={"timestamp_log_dir": False},
+    )
+    if overrides.keys().isdisjoint(_CITIES_FIELDS):
+        config._cache.update(base_config._cache)
+    distances = (
+        _WORKER_STATE["distances"]
+        if overrides.keys().isdisjoint(_DISTANCES_FIELDS)
+        else None
+    )
+    trainer = GeneticTrainer(config, distances=distances)
+    outputs, run_time, peak_memory = Profiler(memory=memory).run(
+        "genetic_algorithm",
+        trainer.fit,
+        stop_threshold=stop_threshold,
+        traced_kwargs={"record": False},
+    )
+    return {
+        "run_id": run_id,
+        "seed": seed,
+        **overrides,
+        "best_fitness": outputs["best_fitness"],
+        "n_generations": outputs["n_generations"],
+        "ga_time": run_time,
+        "time_to_threshold": (
+            run_time if outputs["best_fitness"] <= stop_threshold else None
+        ),
+        "peak_memory_mb": peak_memory,
+    }
+
+
+def summarize(results, names):
+    """Averaging the results of the runs sharing the same hyperparameters
+
+    Args:
+        results: List of results rows
+        names: Names of the swept hyperparameters
+
+    Returns:
+        List of summary rows, best mean fitness first
+    """
+    groups = defaultdict(list)
+    for result in results:
+        groups[tuple(result[name] for name in names)].append(result)
+    summary = []
+    for values, runs in groups.items():
+        reached = [run["time_to_threshold"] for run in runs if run["time_to_threshold"]]
+        summary.append(
+            {
+                **dict(zip(names, values)),
+                "n_runs": len(runs),
+                "mean_best_fitness": float(
+                    np.mean([run["best_fitness"] for run in runs])
+                ),
+                "mean_ga_time": float(np.mean([run["ga_time"] for run in runs])),
+                "n_reached": len(reached),
+                "mean_time_to_threshold": float(np.mean(reached)) if reached else None,
+                "max_peak_memory_mb": max(
+                    (
+                        run["peak_memory_mb"]
+                        for run in runs
+                        if run["peak_memory_mb"] is not None
+                    ),
+                    default=None,
+                ),
+            }
+        )
+    return sorted(summary, key=lambda row: row["mean_best_fitness"])
+
+
+def main():
+    args = parse_args()
+    config = Config.from_files(args.hparams_fp, args.cities_fp)
+    sweep = json.loads(args.sweep_fp.read_text())
+    rng = np.random.default_rng(sweep.get("seed", 0))
+    configurations = sweep_configurations(sweep, rng)
+    names = list(sweep.get("grid", {})) + list(sweep.get("random", {}))
+    tasks = []
+    for overrides in configurations:
+        for _ in range(sweep.get("n_repeats", 1)):
+            seed = int(rng.integers(np.iinfo(np.int32).max))
+            tasks.append((len(tasks), overrides, seed))
+    n_workers = args.n_workers or os.cpu_count() or 1
+    log_info(
+        "Sweeping %d configurations in %d runs on %d workers...",
+        len(configurations),
+        len(tasks),
+        n_workers,
+    )
+
+    distances_shm, distances, distances_spec = build_shared_distances(config)
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_sweep_worker,
+            initargs=(config, distances_spec),
+            mp_context=pool_context(
+                config.use_numba
+                or any(overrides.get("use_numba") for overrides in configurations)
+            ),
+        ) as executor:
+            futures = [
+                executor.submit(_run_sweep, *task, args.stop_threshold, args.memory)
+                for task in tasks
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                log_info("Result: %s", result)
+                results.append(result)
+                results.sort(key=lambda row: row["run_id"])
+                save_results(
+                    results,
+                    args.output_fp,
+                    ["run_id", "seed", *names, *RESULT_FIELDNAMES],
+                )
+    finally:
+        del distances
+        if distances_shm is not None:
+            distances_shm.close()
+            distances_shm.unlink()
+    log_info("Saved results to %s", args.output_fp)
+
+    for row in summarize(results, names):
+        log_info("Summary: %s", row)
+
+
+if __name__ == "__main__":
+    main()
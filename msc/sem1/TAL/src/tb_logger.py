@@ -0,0 +1,75 @@
+import multiprocessing as mp
+import queue
+
+from .config import Config
+from .utils import log_info, pool_context
+
+# Message closing the worker process
+_STOP = None
+
+
+def _tensorboard_worker(config: Config, messages):
+    """Rendering the routes and writing them with the scalars to tensorboard
+
+    Args:
+        config: Config object
+        messages: Queue of (generation, fitness, best individual) messages
+    """
+    from torch.utils.tensorboard import SummaryWriter
+
+    from .utils import plot_route
+
+    writer = SummaryWriter(config.log_dir)
+    writer.add_text(
+        "config", config.model_dump_json(exclude=("log_dir", "cities"), indent=2)
+    )
+    cities_names = config.cities_names
+    while (message := messages.get()) is not _STOP:
+        n_generation, fitness, individual = message
+        writer.add_scalar("fitness", fitness, n_generation)
+        route_plot = plot_route(
+            config, [cities_names[city] for city in individual], fitness, n_generation
+        )
+        writer.add_image("route", route_plot, n_generation, dataformats="HWC")
+    writer.close()
+
+
+class TensorboardLogger:
+    """Logging to tensorboard from a background process, so that rendering \
+        the routes does not stall the evolution. A message is dropped instead \
+        of waiting when the worker falls `max_pending` messages behind
+    """
+
+    def __init__(self, config: Config, max_pending: int = 4):
+        context = pool_context(config.use_numba) or mp.get_context()
+        self.messages = context.Queue(max_pending)
+        self.n_dropped = 0
+        self.worker = context.Process(
+            target=_tensorboard_worker, args=(config, self.messages), daemon=True
+        )
+        self.worker.start()
+
+    def log(self, n_generation: int, fitness: float, individual):
+        """Sending the fitness and the best individual to the worker
+
+        Args:
+            n_generation: Current generation number
+            fitness: Fitness of the best individual
+            individual: Best individual, array of cities indices
+        """
+        try:
+            self.messages.put_nowait((n_generation, fitness, individual.copy()))
+        except queue.Full:
+            self.n_dropped += 1
+
+    def close(self):
+        """Waiting for the worker to write the pending messages"""
+        while self.worker.is_alive():
+            try:
+                self.messages.put(_STOP, timeout=1)
+                break
+            except queue.Full:
+                continue
+        self.worker.join()
+        if self.n_dropped:
+            log_info("Tensorboard logger dropped %d messages", self.n_dropped)
@@ -1,120 +1,447 @@
 import random
-from itertools import permutations
+from pathlib import Path
+from time import time
 
 import numpy as np
-from torch.utils.tensorboard import SummaryWriter
 
+from .checkpoint import CheckpointWriter, load_checkpoint, rng_state, set_rng_state
 from .config import Config
-from .utils import euclidean_distance, log_info, plot_route
+from .crossover import CROSSOVER_OPERATORS, crossover_batch
+from .distances import build_distances
+from .fitness_cache import FitnessCache
+from .initialization import random_population, seeded_population
+from .local_search import improve_tour, nearest_neighbours
+from .metrics import MetricsLogger, generation_stats
+from .profiling import Profiler
+from .selection import get_selection_operator, roulette_wheel
+from .tb_logger import TensorboardLogger
+from .utils import is_installed, log_info, log_warning
 
 
 class GeneticTrainer:
-    def __init__(self, config: Config, whenever_log_to_tb: bool = False):
+    def __init__(
+        self,
+        config: Config,
+        whenever_log_to_tb: bool = False,
+        profiler: Profiler | None = None,
+        distances: np.ndarray | None = None,
+    ):
         self.config = config
         self.whenever_log_to_tb = whenever_log_to_tb
-        if whenever_log_to_tb:
-            self.writer = SummaryWriter(self.config.log_dir)
-            self.writer.add_text(
-                "config",
-                config.model_dump_json(exclude=("log_dir", "cities"), indent=2),
-            )
-
-    def fit(self, stop_threshold: float = 0.0):
+        self.profiler = profiler or Profiler()
+        self.cities_names = config.cities_names
+        self.select = get_selection_operator(config)
+        if distances is None:
+            distances = build_distances(config)
+        elif isinstance(distances, np.ndarray):
+            distances = distances.astype(config.distance_dtype, copy=False)
+        self.distances = distances
+        self.use_numba = config.use_numba and is_installed("numba")
+        if config.use_numba and not self.use_numba:
+            log_warning("Numba is not installed, falling back to NumPy")
+        if self.use_numba and not isinstance(self.distances, np.ndarray):
+            log_warning("Numba kernels need a distance matrix, falling back to NumPy")
+            self.use_numba = False
+        self.fitness_cache = (
+            FitnessCache(config.fitness_cache_size, self.distances.dtype)
+            if config.fitness_cache_size > 0
+            else None
+        )
+        if config.local_search:
+            self.neighbours = nearest_neighbours(self.distances, config.n_neighbours)
+            if not self.use_numba:
+                self.neighbours = self.neighbours.tolist()
+        self.tb_logger = None
+        self.buffers = {}
+
+    def fit(
+        self,
+        stop_threshold: float = 0.0,
+        resume_fp: Path | None = None,
+        record: bool = True,
+    ):
         """Implementing the genetic algorithm to find the optimal solution for the TSP problem
 
+        The tour lengths of every generation are computed once, while creating
+        the offspring, and reused for the statistics and the early stopping,
+        which is checked every generation. Every `config.metrics_interval`
+        generations the statistics are appended to `metrics.jsonl`, and every
+        `config.checkpoint_interval` generations, and at the end of the run,
+        the state of the evolution is saved in the background
+        to `checkpoint.npz`, both in `config.log_dir`. The fitness cache
+        starts empty on every run.
+
+        Args:
+            stop_threshold: Fitness at which the evolution is stopped
+            resume_fp: Path to a checkpoint to resume the evolution from
+            record: Whether to write the metrics, checkpoints and tensorboard \
+                logs, turned off for runs repeated only to measure them
+
         Returns:
-            outputs: Dictionary containing the best individual and best fitness
+            outputs: Dictionary containing the best individual, best fitness \
+                and number of generations run
         """
         outputs = {}
-        population = self.initial_population()
-        for i in range(0, self.config.n_generations):
-            if i % self.config.log_interval == 0:
-                fitness = self.total_dist_individual(self.best_individual(population))
-                self._log(i, population, fitness)
-                if fitness <= stop_threshold:
+        start_time = time()
+        if self.fitness_cache is not None:
+            self.fitness_cache.clear()
+        if resume_fp is None:
+            start_generation = 0
+            population = self.initial_population()
+            lengths = self.evaluate_population(population)
+            best_individual = population[lengths.argmin()].copy()
+            best_fitness = float(lengths.min())
+        else:
+            (
+                start_generation,
+                population,
+                lengths,
+                best_individual,
+                best_fitness,
+            ) = self.load_checkpoint(resume_fp)
+            log_info("Resuming from generation %d of %s", start_generation, resume_fp)
+        n_generations = self.config.n_generations
+        checkpoint_writer = (
+            CheckpointWriter(self.config.log_dir / "checkpoint.npz")
+            if record and self.config.checkpoint_interval > 0
+            else None
+        )
+        metrics_logger = (
+            MetricsLogger(
+                self.config.log_dir / "metrics.jsonl",
+                start_generation,
+                None if resume_fp is None else resume_fp.parent / "metrics.jsonl",
+            )
+            if record and self.config.metrics_interval > 0
+            else None
+        )
+        if record and self.whenever_log_to_tb:
+            self.tb_logger = TensorboardLogger(self.config)
+        try:
+            for i in range(start_generation, self.config.n_generations + 1):
+                best_index = lengths.argmin()
+                if lengths[best_index] < best_fitness:
+                    best_individual = population[best_index].copy()
+                    best_fitness = float(lengths[best_index])
+                stop = best_fitness <= stop_threshold
+                last = stop or i == self.config.n_generations
+                log_metrics = metrics_logger is not None and (
+                    last or i % self.config.metrics_interval == 0
+                )
+                log = last or i % self.config.log_interval == 0
+                if log_metrics or log:
+                    stats = generation_stats(
+                        i, lengths, best_fitness, time() - start_time
+                    )
+                if log_metrics:
+                    metrics_logger.log(stats)
+                if log:
+                    self._log(stats, population[best_index])
+                if stop:
                     log_info(
                         "Stopping early as the stop threshold is reached at generation %d",
                         i,
                     )
+                    n_generations = i
+                if last:
                     break
-            fitness_probs = self.fitness_prob(population)
-            parents_list = self.draw_parents(population, fitness_probs)
-            offspring_list = self.create_offspring(parents_list)
-            mixed_offspring = parents_list + offspring_list
-            fitness_probs = self.fitness_prob(mixed_offspring)
-            sorted_fitness_indices = np.argsort(fitness_probs)[::-1]
-            best_fitness_indices = sorted_fitness_indices[
-                0 : self.config.crossover_size
-            ]
+                if (
+                    checkpoint_writer is not None
+                    and i > start_generation
+                    and i % self.config.checkpoint_interval == 0
+                ):
+                    checkpoint_writer.save(
+                        self.checkpoint_state(
+                            i, population, lengths, best_individual, best_fitness
+                        )
+                    )
+                population, lengths = self.next_generation(population, lengths)
+
+            if checkpoint_writer is not None:
+                checkpoint_writer.save(
+                    self.checkpoint_state(
+                        n_generations,
+                        population,
+                        lengths,
+                        best_individual,
+                        best_fitness,
+                    )
+                )
+        finally:
+            if self.tb_logger is not None:
+                self.tb_logger.close()
+                self.tb_logger = None
+            if checkpoint_writer is not None:
+                checkpoint_writer.close()
+            if metrics_logger is not None:
+                metrics_logger.close()
 
-            best_mixed_offspring = []
-            for i in best_fitness_indices:
-                best_mixed_offspring.append(mixed_offspring[i])
+        outputs = {
+            "best_individual": self.decode(best_individual),
+            "best_fitness": self.total_dist_individual(best_individual),
+            "n_generations": n_generations,
+        }
+        return outputs
 
-            old_population_indices = [
-                random.randint(0, (self.config.n_population - 1))
-                for _ in range(self.config.mutation_size)
-            ]
-            for i in old_population_indices:
-                best_mixed_offspring.append(population[i])
+    def checkpoint_state(
+        self, generation, population, lengths, best_individual, best_fitness
+    ):
+        """Collecting the state of the evolution at the start of a generation
 
-            random.shuffle(best_mixed_offspring)
-            population = best_mixed_offspring
+        Args:
+            generation: Generation number
+            population: Population of individuals
+            lengths: Cached tour lengths of the individuals
+            best_individual: Best individual found so far
+            best_fitness: Fitness of the best individual found so far
 
-        best_individual = self.best_individual(population)
-        outputs = {
+        Returns:
+            Dictionary of arrays, including the states of the global RNGs
+        """
+        return {
+            "generation": np.array(generation),
+            "population": population,
+            "lengths": lengths,
             "best_individual": best_individual,
-            "best_fitness": self.total_dist_individual(best_individual),
+            "best_fitness": np.array(best_fitness),
+            **rng_state(),
         }
-        return outputs
+
+    def load_checkpoint(self, file_path):
+        """Loading a checkpoint and restoring the states of the global RNGs
+
+        Args:
+            file_path: Path to the checkpoint file
+
+        Returns:
+            Generation number, population, tour lengths, best individual \
+                and best fitness found so far
+        """
+        state = load_checkpoint(file_path)
+        expected_shape = (self.config.n_population, self.config.n_cities)
+        if state["population"].shape != expected_shape:
+            raise ValueError(
+                f"Checkpoint population of shape {state['population'].shape} "
+                f"does not match the config, expected {expected_shape}"
+            )
+        set_rng_state(state)
+        return (
+            int(state["generation"]),
+            state["population"],
+            state["lengths"].astype(self.distances.dtype),
+            state["best_individual"],
+            float(state["best_fitness"]),
+        )
+
+    def next_generation(self, population, lengths):
+        """Evolving the population by a single generation \
+            with the replacement strategy set in the config
+
+        Args:
+            population: Population of individuals
+            lengths: Cached tour lengths of the individuals
+
+        Returns:
+            Population of the next generation and its tour lengths
+        """
+        if self.config.replacement == "steady_state":
+            return self.steady_state_generation(population, lengths)
+        with self.profiler.phase("selection"):
+            fitness_probs = self.fitness_prob(population, lengths)
+            parents_indices = self.draw_parents(population, fitness_probs)
+            parents_list = population[parents_indices]
+        offspring_list, offspring_lengths = self.create_offspring(parents_list)
+
+        with self.profiler.phase("replacement"):
+            mixed_offspring = np.concatenate((parents_list, offspring_list))
+            mixed_lengths = np.concatenate(
+                (lengths[parents_indices], offspring_lengths)
+            )
+            best_fitness_indices = np.argpartition(
+                mixed_lengths, self.config.crossover_size - 1
+            )[: self.config.crossover_size]
+
+            old_population_indices = np.random.randint(
+                0, self.config.n_population, self.config.mutation_size
+            )
+            best_mixed_offspring = np.concatenate(
+                (
+                    mixed_offspring[best_fitness_indices],
+                    population[old_population_indices],
+                )
+            )
+            best_mixed_lengths = np.concatenate(
+                (mixed_lengths[best_fitness_indices], lengths[old_population_indices])
+            )
+
+            shuffle = np.random.permutation(len(best_mixed_offspring))
+            return best_mixed_offspring[shuffle], best_mixed_lengths[shuffle]
+
+    def steady_state_generation(self, population, lengths):
+        """Evolving the population by a single generation in place, \
+            the offspring replace the individuals which are not among \
+            the `n_population` shortest tours of parents and offspring together
+
+        Parents are gathered into a preallocated offspring buffer, where
+        the offspring are created, so the population, offspring and survivor
+        selection buffers are reused from one generation to the next.
+
+        Args:
+            population: Population of individuals, updated in place
+            lengths: Cached tour lengths of the individuals, updated in place
+
+        Returns:
+            Population of the next generation and its tour lengths
+        """
+        n_population = len(population)
+        with self.profiler.phase("selection"):
+            fitness_probs = self.fitness_prob(population, lengths)
+            parents_indices = self.draw_parents(population, fitness_probs)
+            buffers = self.generation_buffers(
+                n_population, len(parents_indices), population.shape[1], lengths.dtype
+            )
+            offspring = np.take(
+                population, parents_indices, axis=0, out=buffers["offspring"]
+            )
+        offspring, offspring_lengths = self.create_offspring(offspring, in_place=True)
+
+        with self.profiler.phase("replacement"):
+            candidates_lengths = buffers["candidates_lengths"]
+            candidates_lengths[:n_population] = lengths
+            candidates_lengths[n_population:] = offspring_lengths
+            survivors = np.argpartition(candidates_lengths, n_population - 1)[
+                :n_population
+            ]
+            incoming = survivors[survivors >= n_population] - n_population
+            is_survivor = buffers["is_survivor"]
+            is_survivor.fill(False)
+            is_survivor[survivors[survivors < n_population]] = True
+            outgoing = np.flatnonzero(~is_survivor)
+            population[outgoing] = offspring[incoming]
+            lengths[outgoing] = offspring_lengths[incoming]
+        return population, lengths
+
+    def generation_buffers(self, n_population, n_offspring, n_cities, dtype):
+        """Getting the buffers of `steady_state_generation`, \
+            allocated again only when their shapes change
+
+        Args:
+            n_population: Number of individuals
+            n_offspring: Number of offspring
+            n_cities: Number of cities
+            dtype: Data type of the tour lengths
+
+        Returns:
+            Dictionary of buffers
+        """
+        if self.buffers.get("offspring", np.empty(0)).shape != (n_offspring, n_cities):
+            self.buffers = {
+                "offspring": np.empty((n_offspring, n_cities), dtype=np.int32),
+                "candidates_lengths": np.empty(n_population + n_offspring, dtype=dtype),
+                "is_survivor": np.empty(n_population, dtype=bool),
+            }
+        return self.buffers
 
     def initial_population(self):
-        """Generating initial population of cities randomly \
-            selected from the all possible permutations of the given cities. 
+        """Generating initial population of random permutations of the cities, \
+            a `config.seeding_per` fraction of which comes from the construction \
+            heuristic set in `config.seeding`
 
         Returns:
-            population_perms: list of lists of cities names, each list is a permutation of the cities
+            population_perms: int32 array of shape (n_population, n_cities), \
+                each row is a permutation of the cities indices
         """
-        all_permutations = permutations(self.config.cities_names)
-        population_perms = []
-        for _ in range(self.config.n_population):
-            population_perms.append(list(next(all_permutations)))
+        rng = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+        population_perms = random_population(
+            self.config.n_population, self.config.n_cities, rng
+        )
+        if self.config.seeding != "none":
+            n_seeded = int(self.config.n_population * self.config.seeding_per)
+            population_perms[:n_seeded] = seeded_population(
+                self.distances, n_seeded, self.config.seeding, rng
+            )
         return population_perms
 
+    def decode(self, individual):
+        """Decoding an array of cities indices back to cities names
+
+        Args:
+            individual: Array of cities indices
+
+        Returns:
+            List of cities names
+        """
+        return [self.cities_names[city] for city in individual]
+
     def total_dist_individual(self, individual):
         """Calculating the total distance traveled by individual, \
         one individual means one possible solution (1 permutation)
 
         Args:
-            individual: List of cities names
+            individual: Array of cities indices
 
         Returns:
             Total distance traveled
         """
-        total_dist = 0
-        for i in range(0, len(individual)):
-            if i == len(individual) - 1:
-                total_dist += self._dist_to_cities(individual[i], individual[0])
-            else:
-                total_dist += self._dist_to_cities(individual[i], individual[i + 1])
-        return total_dist
+        return float(self.distances[individual, np.roll(individual, -1)].sum())
+
+    def total_dist_population(self, population):
+        """Calculating the total distance traveled by every individual at once
+
+        The edges of every tour are summed in order in float64, like the Numba
+        kernel does, rather than with the pairwise summation of `sum`, so that
+        both paths give the same lengths to the bit.
+
+        Args:
+            population: Array of shape (n_individuals, n_cities) of cities indices
+
+        Returns:
+            Array of total distances traveled, one per individual
+        """
+        if self.use_numba:
+            from .kernels import tour_lengths
+
+            return tour_lengths(self.distances, population)
+        # Edges along the rows, a reduction over the outer axis adds them in order
+        tours = np.ascontiguousarray(population.T)
+        edges = self.distances[tours, np.roll(tours, -1, axis=0)]
+        return np.add.reduce(edges, axis=0, dtype=np.float64).astype(
+            edges.dtype, copy=False
+        )
+
+    def evaluate_population(self, population):
+        """Calculating the total distance traveled by every individual, \
+            through the fitness cache if it is enabled
+
+        Args:
+            population: Array of shape (n_individuals, n_cities) of cities indices
+
+        Returns:
+            Array of total distances traveled, one per individual
+        """
+        if self.fitness_cache is None:
+            return self.total_dist_population(population)
+        return self.fitness_cache.evaluate(population, self.total_dist_population)
 
-    def fitness_prob(self, population):
+    def fitness_prob(self, population, lengths=None):
         """Calculating the fitness probability
 
         Args:
             population: Population of individuals
+            lengths: Cached tour lengths of the individuals, computed if None
 
         Returns:
             Population fitness probability
         """
-        total_dist_all_individuals = []
-        for i in range(0, len(population)):
-            total_dist_all_individuals.append(self.total_dist_individual(population[i]))
+        if lengths is None:
+            lengths = self.total_dist_population(population)
+        total_dist_all_individuals = lengths
 
-        max_population_cost = max(total_dist_all_individuals)
+        max_population_cost = total_dist_all_individuals.max()
         population_fitness = max_population_cost - total_dist_all_individuals
-        population_fitness_sum = sum(population_fitness)
+        population_fitness_sum = population_fitness.sum()
+        if population_fitness_sum == 0:
+            return np.full(len(population), 1 / len(population))
         population_fitness_probs = population_fitness / population_fitness_sum
         return population_fitness_probs
 
@@ -128,143 +455,208 @@ class GeneticTrainer:
         Returns:
             Selected individual
         """
-        population_fitness_probs_cumsum = fitness_probs.cumsum()
-        bool_prob_array = population_fitness_probs_cumsum < np.random.uniform(0, 1, 1)
-        selected_individual_index = len(bool_prob_array[bool_prob_array]) - 1
-        return population[selected_individual_index]
+        return population[roulette_wheel(fitness_probs, 1)[0]]
 
     def crossover(self, parent_1, parent_2):
-        """Implement mating strategy using simple crossover between 2 parents
+        """Implement mating strategy using the crossover operator set in the config
 
         Args:
-            parent_1: First parent
-            parent_2: Second parent
+            parent_1: First parent, array of cities indices
+            parent_2: Second parent, array of cities indices
 
         Returns:
             offspring_1: First offspring
             offspring_2: Second offspring
         """
-        n_cities_cut = self.config.n_cities - 1
-        cut = round(random.uniform(1, n_cities_cut))
-        offspring_1 = []
-        offspring_2 = []
+        return CROSSOVER_OPERATORS[self.config.crossover](parent_1, parent_2)
 
-        offspring_1 = parent_1[0:cut]
-        offspring_1 += [city for city in parent_2 if city not in offspring_1]
-
-        offspring_2 = parent_2[0:cut]
-        offspring_2 += [city for city in parent_1 if city not in offspring_2]
-
-        return offspring_1, offspring_2
-
-    def mutation(self, offspring):
-        """Implement mutation strategy in a single offspring
+    def mutation(self, offspring, length):
+        """Implement mutation strategy in a single offspring, \
+            the tour length is updated from the edges touched by the swap only
 
         Args:
             offspring: Offspring individual
+            length: Tour length of the offspring
 
         Returns:
-            Mutated offspring
+            Mutated offspring and its tour length
         """
-        n_cities_cut = self.config.n_cities - 1
-        index_1 = round(random.uniform(0, n_cities_cut))
-        index_2 = round(random.uniform(0, n_cities_cut))
-
-        temp = offspring[index_1]
-        offspring[index_1] = offspring[index_2]
-        offspring[index_2] = temp
-        return offspring
+        n_cities = self.config.n_cities
+        index_1, index_2 = self.swap_positions()
 
-    def draw_parents(self, population, fitness_probs):
-        """Drawing parents from the population based on fitness probabilities
+        # Distinct edges in the order summed by the Numba kernel
+        edges = dict.fromkeys(
+            [(index_1 - 1) % n_cities, index_1, (index_2 - 1) % n_cities, index_2]
+        )
+        length = float(length) - self._edges_length(offspring, edges)
+        offspring[[index_1, index_2]] = offspring[[index_2, index_1]]
+        length += self._edges_length(offspring, edges)
+        return offspring, length
 
-        Args:
-            population: Population of individuals
-            fitness_probs: Population fitness probability
+    def swap_positions(self):
+        """Drawing the positions of the cities swapped by a mutation
 
         Returns:
-            List of selected parents
+            Two positions, possibly equal
         """
-        return [
-            self.roulette_wheel(population, fitness_probs)
-            for _ in range(int(self.config.crossover_per * self.config.n_population))
-        ]
+        n_cities = self.config.n_cities
+        return (
+            round(random.uniform(0, n_cities - 1)),
+            round(random.uniform(0, n_cities - 1)),
+        )
 
-    def create_offspring(self, parents_list):
-        """Creating offspring from the selected parents
+    def _edges_length(self, individual, edges):
+        """Calculating the total length of the given edges of a tour
 
         Args:
-            parents_list: List of selected parents
+            individual: Array of cities indices
+            edges: Positions of the edges, edge `k` joins positions `k` and `k + 1`
 
         Returns:
-            List of offspring
+            Total length of the edges, summed in order in float64
         """
-        offspring_list = []
-        for i in range(0, len(parents_list), 2):
-            offspring_1, offspring_2 = self.crossover(
-                parents_list[i], parents_list[i + 1]
+        n_cities = len(individual)
+        length = 0.0
+        for k in edges:
+            length += float(
+                self.distances[individual[k], individual[(k + 1) % n_cities]]
             )
+        return length
 
-            mutate_threashold = random.random()
-            if mutate_threashold > (1 - self.config.mutation_per):
-                offspring_1 = self.mutation(offspring_1)
+    def local_search(self, offspring):
+        """Implement memetic step improving a single offspring \
+            with 2-opt and Or-opt moves towards the nearest neighbours
 
-            mutate_threashold = random.random()
-            if mutate_threashold > (1 - self.config.mutation_per):
-                offspring_2 = self.mutation(offspring_2)
+        Args:
+            offspring: Offspring individual
 
-            offspring_list.append(offspring_1)
-            offspring_list.append(offspring_2)
-        return offspring_list
+        Returns:
+            Improved offspring
+        """
+        return improve_tour(offspring, self.distances, self.neighbours)
 
-    def best_individual(self, population):
-        """Finding the best individual from the population
+    def draw_parents(self, population, fitness_probs):
+        """Drawing all parents from the population at once \
+            with the selection operator set in the config
 
         Args:
             population: Population of individuals
+            fitness_probs: Population fitness probability
 
         Returns:
-            Best individual
+            Indices of the selected parents
         """
-        total_dist_all_individuals = []
-        for i in range(0, len(population)):
-            total_dist_all_individuals.append(self.total_dist_individual(population[i]))
+        n_parents = int(self.config.crossover_per * self.config.n_population)
+        return self.select(fitness_probs, n_parents)
 
-        best_individual_index = total_dist_all_individuals.index(
-            min(total_dist_all_individuals)
-        )
-        best_individual = population[best_individual_index]
+    def create_offspring(self, parents_list, in_place=False):
+        """Creating offspring from the selected parents
 
-        return best_individual
+        Args:
+            parents_list: List of selected parents
+            in_place: Whether the offspring overwrite `parents_list`
 
-    def _dist_to_cities(self, city_1: str, city_2: str):
-        """Calculating the distance between two cities
+        Returns:
+            Array of offspring and array of their tour lengths
+        """
+        with self.profiler.phase("crossover"):
+            n_paired = len(parents_list) // 2 * 2
+            offspring_1, offspring_2 = crossover_batch(
+                parents_list[0:n_paired:2],
+                parents_list[1:n_paired:2],
+                self.config.crossover,
+                self.use_numba,
+            )
+            offspring_list = parents_list if in_place else parents_list.copy()
+            offspring_list[0:n_paired:2] = offspring_1
+            offspring_list[1:n_paired:2] = offspring_2
+
+        with self.profiler.phase("evaluation"):
+            offspring_lengths = self.evaluate_population(offspring_list)
+
+        with self.profiler.phase("mutation"):
+            mutate_threasholds = np.random.random(len(offspring_list))
+            mutated = np.nonzero(mutate_threasholds > (1 - self.config.mutation_per))[0]
+            if self.use_numba:
+                from .kernels import swap_mutation
+
+                index_pairs = np.array(
+                    [self.swap_positions() for _ in mutated], dtype=np.int64
+                ).reshape(-1, 2)
+                swap_mutation(
+                    offspring_list,
+                    offspring_lengths,
+                    self.distances,
+                    mutated,
+                    index_pairs,
+                )
+            else:
+                for i in mutated:
+                    offspring_list[i], offspring_lengths[i] = self.mutation(
+                        offspring_list[i], offspring_lengths[i]
+                    )
+
+        if self.config.local_search:
+            with self.profiler.phase("local_search"):
+                local_search_threasholds = np.random.random(len(offspring_list))
+                improved = np.nonzero(
+                    local_search_threasholds < self.config.local_search_per
+                )[0]
+                if self.use_numba:
+                    from .kernels import improve_tours
+
+                    improve_tours(
+                        offspring_list,
+                        offspring_lengths,
+                        self.distances,
+                        self.neighbours,
+                        improved,
+                    )
+                else:
+                    for i in improved:
+                        offspring_list[i] = self.local_search(offspring_list[i])
+                        offspring_lengths[i] = self.total_dist_individual(
+                            offspring_list[i]
+                        )
+        return offspring_list, offspring_lengths
+
+    def best_individual(self, population, lengths=None):
+        """Finding the best individual from the population
 
         Args:
-            city_1: City one name
-            city_2: City two name
+            population: Population of individuals
+            lengths: Cached tour lengths of the individuals, computed if None
 
         Returns:
-            Calculated Euclidean distance between two cities
+            Best individual
         """
-        city_coords = self.config.city_coords
-        return euclidean_distance(city_coords[city_1], city_coords[city_2])
+        if lengths is None:
+            lengths = self.total_dist_population(population)
+        return population[np.argmin(lengths)]
 
-    def _log(self, n_generation, population, fitness):
-        """Logging the information to tensorboard
+    def _log(self, stats, best_individual):
+        """Logging the information, tensorboard writes happen in a background process
 
         Args:
-            n_generation: Current generation number
-            population: Population of individuals
-            fitness: Fitness of the best individual
+            stats: Statistics of the current generation
+            best_individual: Best individual of the population
         """
-        log_info("Generation: %d, Best fitness: %.2f", n_generation, fitness)
-        if self.whenever_log_to_tb:
-            self.writer.add_scalar("fitness", fitness, n_generation)
-            route_plot = plot_route(
-                self.config,
-                self.best_individual(population),
-                fitness,
-                n_generation,
+        log_info(
+            "Generation: %d, Best fitness: %.2f, Mean fitness: %.2f, Diversity: %.2f",
+            stats["generation"],
+            stats["best_fitness"],
+            stats["mean_fitness"],
+            stats["diversity"],
+        )
+        if self.fitness_cache is not None:
+            log_info(
+                "Fitness cache: %d entries, %d hits, %d misses (%.1f%% hit rate)",
+                len(self.fitness_cache),
+                self.fitness_cache.hits,
+                self.fitness_cache.misses,
+                100 * self.fitness_cache.hit_rate,
+            )
+        if self.tb_logger is not None:
+            self.tb_logger.log(
+                stats["generation"], stats["best_fitness"], best_individual
             )
-            self.writer.add_image("route", route_plot, n_generation, dataformats="HWC")
@@ -0,0 +1,371 @@
+from time import time
+
+import numpy as np
+
+from .local_search import improve_tour, nearest_neighbours
+from .utils import distance_matrix, log_info, log_warning
+
+_EPS = 1e-9
+
+# Edge states of the `fixed` matrix of a branch-and-bound node
+_FREE, _INCLUDED, _EXCLUDED = 0, 1, -1
+
+
+def _one_tree(distances, fixed, pi):
+    """Computing the minimum 1-tree under node penalties: a minimum spanning \
+        tree of all cities but the first one, built with Prim's algorithm, \
+        plus the two cheapest edges of the first city
+
+    Included edges are preferred over any free edge and excluded edges are
+    never used, so the 1-tree contains all included edges whenever possible.
+
+    Args:
+        distances: Distance matrix
+        fixed: Matrix of edge states, `_INCLUDED`, `_EXCLUDED` or `_FREE`
+        pi: Penalties of the cities
+
+    Returns:
+        Held-Karp bound, degrees of the cities and array of shape \
+            (n_cities, 2) of edges, None if no 1-tree respects `fixed`
+    """
+    n_cities = len(distances)
+    costs = distances + pi[:, None] + pi[None, :]
+    big = n_cities * (np.abs(costs).max() + 1.0)
+    keys = np.where(fixed == _INCLUDED, costs - big, costs)
+    keys[fixed == _EXCLUDED] = np.inf
+
+    edges = np.empty((n_cities, 2), dtype=np.int64)
+    key = keys[1].copy()
+    parent = np.ones(n_cities, dtype=np.int64)
+    in_tree = np.zeros(n_cities, dtype=bool)
+    in_tree[:2] = True
+    key[:2] = np.inf
+    for k in range(n_cities - 2):
+        city = int(np.argmin(key))
+        if key[city] == np.inf:
+            return None
+        edges[k] = parent[city], city
+        in_tree[city] = True
+        key[city] = np.inf
+        closer = (keys[city] < key) & ~in_tree
+        key[closer] = keys[city, closer]
+        parent[closer] = city
+
+    first_keys = keys[0, 1:]
+    nearest = np.argpartition(first_keys, 1)[:2]
+    if first_keys[nearest].max() == np.inf:
+        return None
+    edges[-2:, 0] = 0
+    edges[-2:, 1] = nearest + 1
+
+    n_included = np.count_nonzero(fixed == _INCLUDED) // 2
+    if np.count_nonzero(fixed[edges[:, 0], edges[:, 1]] == _INCLUDED) < n_included:
+        return None
+    bound = costs[edges[:, 0], edges[:, 1]].sum() - 2 * pi.sum()
+    degrees = np.bincount(edges.ravel(), minlength=n_cities)
+    return float(bound), degrees, edges
+
+
+def _ascent(distances, fixed, pi, upper_bound, n_iterations, step):
+    """Raising the 1-tree bound of a node with the Held-Karp subgradient \
+        ascent on the penalties, stopped early once the node can be pruned
+
+    Args:
+        distances: Distance matrix
+        fixed: Matrix of edge states of the node
+        pi: Starting penalties, set in place to the ones of the best bound
+        upper_bound: Length of the best tour found so far
+        n_iterations: Maximum number of iterations
+        step: Initial step size relative to the gap to `upper_bound`
+
+    Returns:
+        Best bound, degrees and edges of its 1-tree, None if the node \
+            is infeasible
+    """
+    best, best_pi = None, pi.copy()
+    for _ in range(n_iterations):
+        tree = _one_tree(distances, fixed, pi)
+        if tree is None:
+            return None
+        bound, degrees, _ = tree
+        if best is None or bound > best[0]:
+            best, best_pi[:] = tree, pi
+        gradient = degrees - 2
+        norm = np.dot(gradient, gradient)
+        if bound >= upper_bound - _EPS or norm == 0:
+            break
+        pi += step * (upper_bound - bound) / norm * gradient
+        step *= 0.95
+    pi[:] = best_pi
+    return best
+
+
+def _eliminate_edges(distances, fixed, pi, tree, upper_bound):
+    """Excluding the edges whose inclusion would raise the 1-tree bound \
+        to the best tour length
+
+    Forcing a non-tree edge into the 1-tree replaces the longest edge
+    of the tree path between its cities, or the longer edge of the first
+    city, so the bound of every tour using it is known without solving.
+
+    Args:
+        distances: Distance matrix
+        fixed: Matrix of edge states, updated in place
+        pi: Penalties of the 1-tree
+        tree: Bound, degrees and edges of the 1-tree
+        upper_bound: Length of the best tour found so far
+    """
+    bound, _, edges = tree
+    n_cities = len(distances)
+    costs = distances + pi[:, None] + pi[None, :]
+    path_max = np.full((n_cities, n_cities), -np.inf)
+    visited = [1]
+    for parent, city in edges[:-2].tolist():
+        path_max[city, visited] = np.maximum(
+            path_max[parent, visited], costs[parent, city]
+        )
+        path_max[visited, city] = path_max[city, visited]
+        visited.append(city)
+    path_max[0, 1:] = path_max[1:, 0] = costs[0, edges[-2:, 1]].max()
+    fixed[bound + costs - path_max >= upper_bound - _EPS] = _EXCLUDED
+
+
+def _tree_tour(edges, n_cities):
+    """Walking a 1-tree in which every city has degree 2
+
+    Args:
+        edges: Array of edges of the 1-tree
+        n_cities: Number of cities
+
+    Returns:
+        Tour as an array of cities indices starting with the first city
+    """
+    adjacency = [[] for _ in range(n_cities)]
+    for a, b in edges.tolist():
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+    tour = [0, adjacency[0][0]]
+    while len(tour) < n_cities:
+        a, b = adjacency[tour[-1]]
+        tour.append(b if a == tour[-2] else a)
+    return np.array(tour)
+
+
+def _include(fixed, a, b):
+    """Including an edge in a node and excluding the other edges \
+        of its cities once they have two included edges
+
+    Args:
+        fixed: Matrix of edge states, updated in place
+        a: First city of the edge
+        b: Second city of the edge
+
+    Returns:
+        Whether the node is still feasible
+    """
+    fixed[a, b] = fixed[b, a] = _INCLUDED
+    for city in (a, b):
+        included = fixed[city] == _INCLUDED
+        n_included = np.count_nonzero(included)
+        if n_included > 2:
+            return False
+        if n_included == 2:
+            fixed[city, ~included] = _EXCLUDED
+            fixed[~included, city] = _EXCLUDED
+    return True
+
+
+def _exclude(fixed, a, b):
+    """Excluding an edge from a node
+
+    Args:
+        fixed: Matrix of edge states, updated in place
+        a: First city of the edge
+        b: Second city of the edge
+
+    Returns:
+        Whether the node is still feasible
+    """
+    fixed[a, b] = fixed[b, a] = _EXCLUDED
+    return True
+
+
+def _propagate(fixed):
+    """Including the remaining edges of the cities left with only two \
+        edges that are not excluded, until no such city has a free edge
+
+    Args:
+        fixed: Matrix of edge states, updated in place
+
+    Returns:
+        Whether the node is still feasible
+    """
+    while True:
+        allowed = fixed != _EXCLUDED
+        n_allowed = np.count_nonzero(allowed, axis=1)
+        if (n_allowed < 2).any():
+            return False
+        n_free = np.count_nonzero(fixed == _FREE, axis=1)
+        cities = np.flatnonzero((n_allowed == 2) & (n_free > 0))
+        if len(cities) == 0:
+            return True
+        for city in cities.tolist():
+            for other in np.flatnonzero(fixed[city] == _FREE).tolist():
+                if not _include(fixed, city, other):
+                    return False
+
+
+def _branch(fixed, degrees, edges):
+    """Splitting a node on the free 1-tree edges of a city of degree above 2
+
+    With free edges `e1` and `e2` of the city, the children exclude `e1`,
+    include `e1` and exclude `e2`, and include both, so that every tour
+    of the node belongs to exactly one child.
+
+    Args:
+        fixed: Matrix of edge states of the node
+        degrees: Degrees of the cities in the 1-tree of the node
+        edges: Edges of the 1-tree of the node
+
+    Returns:
+        List of the feasible children `fixed` matrices, the last one first
+    """
+    city = int(np.argmax(degrees))
+    incident = edges[(edges[:, 0] == city) | (edges[:, 1] == city)]
+    free = [(int(a), int(b)) for a, b in incident if fixed[a, b] == _FREE]
+    moves = [[(_exclude, free[0])], [(_include, free[0])]]
+    if np.count_nonzero(fixed[city] == _INCLUDED) == 0:
+        moves[1].append((_exclude, free[1]))
+        moves.append([(_include, free[0]), (_include, free[1])])
+
+    children = []
+    for child_moves in moves:
+        child = fixed.copy()
+        if all(move(child, *edge) for move, edge in child_moves) and _propagate(child):
+            children.append(child)
+    return children[::-1]
+
+
+def _initial_tour(distances, initial_tour):
+    """Building the tour giving the first upper bound, improved by local search
+
+    Args:
+        distances: Distance matrix
+        initial_tour: Array of cities indices or None for a nearest neighbour tour
+
+    Returns:
+        Tour as an array of cities indices
+    """
+    n_cities = len(distances)
+    if initial_tour is None:
+        initial_tour = [0]
+        unvisited = np.ones(n_cities, dtype=bool)
+        unvisited[0] = False
+        for _ in range(n_cities - 1):
+            row = np.where(unvisited, distances[initial_tour[-1]], np.inf)
+            initial_tour.append(int(np.argmin(row)))
+            unvisited[initial_tour[-1]] = False
+    neighbours = nearest_neighbours(distances, 10).tolist()
+    return improve_tour(np.asarray(initial_tour), distances, neighbours)
+
+
+def tsp_branch_and_bound(
+    city_coords: dict[str, tuple[float, float]],
+    initial_tour: list[str] | None = None,
+    return_tour: bool = False,
+    max_nodes: int | None = None,
+) -> float | tuple[float, list[str]]:
+    """Solve the Travelling Salesman Problem using branch-and-bound.
+
+    Depth-first search over edge inclusions and exclusions bounded by the
+    Held-Karp 1-tree bound. The penalties of the root are raised by a long
+    subgradient ascent and every child warm-starts a short one from the
+    penalties of its parent. A node whose bound reaches the best tour length
+    is pruned and a node whose 1-tree is a tour improves it. Edges which
+    cannot belong to a shorter tour are excluded from the subtree of a node
+    and cities left with two edges get both of them included. Only the stack
+    of the search is kept, each entry being an int8 matrix of edge states,
+    so the memory grows with the depth and not with the number of subsets
+    like in the dynamic programming algorithm.
+
+    Args:
+        city_coords: Dictionary containing the coordinates of each city
+        initial_tour: Tour giving the first upper bound as a list of cities \
+            names, e.g. the best individual of the genetic algorithm, \
+            a nearest neighbour tour is used if None
+        return_tour: Whether to return the optimal tour as well
+        max_nodes: Maximum number of explored nodes, the best tour found \
+            is returned without an optimality guarantee once it is reached
+
+    Returns:
+        Minimum cost to visit all cities, and the optimal tour \
+            as a list of cities names if `return_tour` is set
+    """
+    num_cities = len(city_coords)
+    cities_names = list(city_coords.keys())
+    if num_cities < 2:
+        return (0.0, cities_names) if return_tour else 0.0
+    distances = distance_matrix(list(city_coords.values()))
+    if num_cities < 4:
+        # Every tour of at most 3 cities has the same length
+        cost = float(
+            distances[np.arange(num_cities), np.roll(np.arange(num_cities), -1)].sum()
+        )
+        return (cost, cities_names) if return_tour else cost
+
+    if initial_tour is not None:
+        city_index = {name: i for i, name in enumerate(cities_names)}
+        initial_tour = [city_index[name] for name in initial_tour]
+    best_tour = _initial_tour(distances, initial_tour)
+    upper_bound = float(distances[best_tour, np.roll(best_tour, -1)].sum())
+    log_info("Branch-and-bound initial upper bound: %.2f", upper_bound)
+
+    start_time = time()
+    fixed = np.zeros((num_cities, num_cities), dtype=np.int8)
+    np.fill_diagonal(fixed, _EXCLUDED)
+    pi = np.zeros(num_cities)
+    root = _ascent(distances, fixed, pi, upper_bound, 10 * num_cities, 2.0)
+    log_info("Branch-and-bound root lower bound: %.2f", root[0])
+    _eliminate_edges(distances, fixed, pi, root, upper_bound)
+    log_info(
+        "Branch-and-bound kept %d of %d edges",
+        np.count_nonzero(fixed == _FREE) // 2,
+        num_cities * (num_cities - 1) // 2,
+    )
+
+    stack = [(fixed, pi)]
+    n_nodes = 0
+    while stack:
+        if max_nodes is not None and n_nodes >= max_nodes:
+            log_warning(
+                "Branch-and-bound stopped after %d nodes, the tour may be suboptimal",
+                n_nodes,
+            )
+            break
+        fixed, pi = stack.pop()
+        n_nodes += 1
+        node = _ascent(distances, fixed, pi, upper_bound, num_cities, 1.0)
+        if node is None or node[0] >= upper_bound - _EPS:
+            continue
+        bound, degrees, edges = node
+        if (degrees == 2).all():
+            best_tour = _tree_tour(edges, num_cities)
+            upper_bound = bound
+            log_info(
+                "Branch-and-bound node %d: new best tour %.2f", n_nodes, upper_bound
+            )
+            continue
+        _eliminate_edges(distances, fixed, pi, node, upper_bound)
+        for child in _branch(fixed, degrees, edges):
+            stack.append((child, pi.copy()))
+    log_info(
+        "Branch-and-bound explored %d nodes in %.2f seconds",
+        n_nodes,
+        time() - start_time,
+    )
+
+    min_cost = float(distances[best_tour, np.roll(best_tour, -1)].sum())
+    if not return_tour:
+        return min_cost
+    start = int(np.flatnonzero(best_tour == 0)[0])
+    return min_cost, [cities_names[city] for city in np.roll(best_tour, -start)]
@@ -1,43 +1,269 @@
-from .utils import euclidean_distance
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import time
 
+import numpy as np
 
-def tsp_dynamic_programming(city_coords: dict[str, tuple[float, float]]) -> float:
+from .shared_array import attach_shared_array, create_shared_array
+from .utils import (
+    distance_matrix,
+    is_installed,
+    log_info,
+    log_warning,
+    pool_context,
+)
+
+# Views of the shared tables of a worker process, set by `_init_held_karp_worker`
+_WORKER_STATE = {}
+
+
+def popcount_layers(n_bits: int) -> list[np.ndarray]:
+    """Grouping all masks of `n_bits` bits by the number of set bits.
+
+    Args:
+        n_bits: Number of bits of the masks
+
+    Returns:
+        List where the k-th element holds the masks with k bits set
+    """
+    masks = np.arange(1 << n_bits, dtype=np.int64)
+    popcounts = np.bitwise_count(masks)
+    order = np.argsort(popcounts, kind="stable")
+    return np.split(masks[order], np.cumsum(np.bincount(popcounts))[:-1])
+
+
+def _relax_masks(dp, parents, masks, rest_distances):
+    """Computing `dp` for the given masks from the layer below them.
+
+    Args:
+        dp: Held-Karp table
+        parents: uint8 table of predecessors, None to skip recording them
+        masks: Masks with the same number of set bits
+        rest_distances: Distances between all cities but the start one
+    """
+    for last in range(dp.shape[1]):
+        bit = 1 << last
+        with_last = masks[(masks & bit) != 0]
+        prev_costs = dp[with_last ^ bit] + rest_distances[:, last]
+        if parents is None:
+            dp[with_last, last] = prev_costs.min(axis=1)
+        else:
+            best_prev = prev_costs.argmin(axis=1)
+            parents[with_last, last] = best_prev
+            dp[with_last, last] = prev_costs[np.arange(len(best_prev)), best_prev]
+
+
+def _prepare_held_karp(city_coords, dtype, return_tour):
+    """Validating the input and computing the distances used by Held-Karp.
+
+    Args:
+        city_coords: Dictionary containing the coordinates of each city
+        dtype: Floating point type of the table
+        return_tour: Whether the optimal tour is requested
+
+    Returns:
+        Distance matrix of all cities
+    """
+    if return_tour and len(city_coords) > 257:
+        raise ValueError("Parent table supports up to 257 cities")
+    return distance_matrix(list(city_coords.values()), dtype)
+
+
+def _init_tables(dp, parents, from_start):
+    """Filling the tables with the single-city paths from the start city.
+
+    Args:
+        dp: Held-Karp table
+        parents: uint8 table of predecessors or None
+        from_start: Distances from the start city
+    """
+    n_rest = dp.shape[1]
+    dp.fill(np.inf)
+    dp[1 << np.arange(n_rest), np.arange(n_rest)] = from_start
+    if parents is not None:
+        parents.fill(0)
+
+
+def _finish_held_karp(dp, parents, to_start, cities_names):
+    """Closing the tours and reconstructing the optimal one if requested.
+
+    Args:
+        dp: Filled Held-Karp table
+        parents: uint8 table of predecessors, None if not recorded
+        to_start: Distances back to the start city
+        cities_names: Names of the cities
+
+    Returns:
+        Minimum cost, and the optimal tour if `parents` were recorded
+    """
+    final_costs = dp[-1] + to_start
+    min_cost = float(final_costs.min())
+    if parents is None:
+        return min_cost
+
+    tour = []
+    mask, last = dp.shape[0] - 1, int(final_costs.argmin())
+    while mask:
+        tour.append(last + 1)
+        mask, last = mask ^ (1 << last), int(parents[mask, last])
+    tour.append(0)
+    return min_cost, [cities_names[city] for city in reversed(tour)]
+
+
+def tsp_dynamic_programming(
+    city_coords: dict[str, tuple[float, float]],
+    dtype=np.float32,
+    return_tour: bool = False,
+    use_numba: bool = False,
+) -> float | tuple[float, list[str]]:
     """Solve the Travelling Salesman Problem using dynamic programming.
 
+    Held-Karp algorithm with the tour starting and ending in the first city.
+    The table `dp[mask, last]` keeps only masks including the start city, so
+    bit `i` of `mask` and column `i` refer to city `i + 1`. Masks are processed
+    layer by layer by the number of visited cities, each layer being a single
+    vectorized min-plus update per last city.
+
     Args:
         city_coords: Dictionary containing the coordinates of each city
+        dtype: Floating point type of the table
+        return_tour: Whether to record predecessors in a uint8 table \
+            of the same shape as `dp` and return the optimal tour as well
+        use_numba: Whether to relax the masks with the compiled kernel, \
+            which runs on all cores and needs no temporary tables
 
     Returns:
-        Minimum cost to visit all cities
+        Minimum cost to visit all cities, and the optimal tour \
+            as a list of cities names if `return_tour` is set
     """
     num_cities = len(city_coords)
     cities_names = list(city_coords.keys())
+    if num_cities < 2:
+        return (0.0, cities_names) if return_tour else 0.0
+    distances = _prepare_held_karp(city_coords, dtype, return_tour)
+    n_rest = num_cities - 1
+    if use_numba and not is_installed("numba"):
+        log_warning("Numba is not installed, falling back to NumPy")
+        use_numba = False
+    if use_numba:
+        from .kernels import relax_masks
+
+    dp = np.empty((1 << n_rest, n_rest), dtype=dtype)
+    parents = np.empty(dp.shape, dtype=np.uint8) if return_tour else None
+    _init_tables(dp, parents, distances[0, 1:])
 
-    distances = [[0] * num_cities for _ in range(num_cities)]
-    for i in range(num_cities):
-        for j in range(num_cities):
-            distances[i][j] = euclidean_distance(
-                city_coords[cities_names[i]], city_coords[cities_names[j]]
+    rest_distances = np.ascontiguousarray(distances[1:, 1:])
+    for masks in popcount_layers(n_rest)[2:]:
+        if use_numba:
+            relax_masks(
+                dp,
+                parents if return_tour else np.empty((0, 0), dtype=np.uint8),
+                masks,
+                rest_distances,
+                return_tour,
             )
+        else:
+            _relax_masks(dp, parents, masks, rest_distances)
+
+    return _finish_held_karp(dp, parents, distances[1:, 0], cities_names)
+
+
+def _init_held_karp_worker(dp_spec, parents_spec, rest_distances):
+    """Attaching a worker process to the shared Held-Karp tables.
+
+    Args:
+        dp_spec: Name, shape and dtype of the shared `dp` table
+        parents_spec: Name, shape and dtype of the shared parent table or None
+        rest_distances: Distances between all cities but the start one
+    """
+    _WORKER_STATE["dp_shm"], _WORKER_STATE["dp"] = attach_shared_array(*dp_spec)
+    _WORKER_STATE["parents"] = None
+    if parents_spec is not None:
+        _WORKER_STATE["parents_shm"], _WORKER_STATE["parents"] = attach_shared_array(
+            *parents_spec
+        )
+    _WORKER_STATE["rest_distances"] = rest_distances
 
-    dp = [[float("inf")] * num_cities for _ in range(1 << num_cities)]
-    dp[1][0] = 0
-
-    for mask in range(1 << num_cities):
-        for last in range(num_cities):
-            if not (mask & (1 << last)):
-                continue
-            for next_city in range(num_cities):
-                if mask & (1 << next_city):
-                    continue
-                new_mask = mask | (1 << next_city)
-                dp[new_mask][next_city] = min(
-                    dp[new_mask][next_city], dp[mask][last] + distances[last][next_city]
-                )
 
-    min_cost = float("inf")
-    final_mask = (1 << num_cities) - 1
-    for last in range(1, num_cities):
-        min_cost = min(min_cost, dp[final_mask][last] + distances[last][0])
+def _relax_masks_worker(masks):
+    """Running `_relax_masks` on the shared tables of a worker process.
 
-    return min_cost
+    Args:
+        masks: Chunk of masks of a single layer
+    """
+    _relax_masks(
+        _WORKER_STATE["dp"],
+        _WORKER_STATE["parents"],
+        masks,
+        _WORKER_STATE["rest_distances"],
+    )
+
+
+def tsp_dynamic_programming_parallel(
+    city_coords: dict[str, tuple[float, float]],
+    n_workers: int | None = None,
+    dtype=np.float32,
+    return_tour: bool = False,
+    chunk_size: int = 1 << 16,
+) -> float | tuple[float, list[str]]:
+    """Solve the Travelling Salesman Problem using dynamic programming \
+    on several processes.
+
+    Same algorithm as `tsp_dynamic_programming`. The tables live in shared
+    memory and the masks of every layer, which depend only on the layer below,
+    are split into chunks relaxed by worker processes writing disjoint rows.
+    The time spent on every layer is logged.
+
+    Args:
+        city_coords: Dictionary containing the coordinates of each city
+        n_workers: Number of worker processes, all cores if None
+        dtype: Floating point type of the table
+        return_tour: Whether to return the optimal tour as well
+        chunk_size: Maximum number of masks relaxed by a single task
+
+    Returns:
+        Minimum cost to visit all cities, and the optimal tour \
+            as a list of cities names if `return_tour` is set
+    """
+    num_cities = len(city_coords)
+    cities_names = list(city_coords.keys())
+    if num_cities < 2:
+        return (0.0, cities_names) if return_tour else 0.0
+    distances = _prepare_held_karp(city_coords, dtype, return_tour)
+    n_rest = num_cities - 1
+    n_workers = n_workers or os.cpu_count() or 1
+
+    shape = (1 << n_rest, n_rest)
+    dp_shm, dp = create_shared_array(shape, dtype)
+    parents_shm, parents = (
+        create_shared_array(shape, np.uint8) if return_tour else (None, None)
+    )
+    try:
+        _init_tables(dp, parents, distances[0, 1:])
+        dp_spec = (dp_shm.name, shape, dtype)
+        parents_spec = (parents_shm.name, shape, np.uint8) if return_tour else None
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_held_karp_worker,
+            initargs=(dp_spec, parents_spec, distances[1:, 1:]),
+            mp_context=pool_context(),
+        ) as executor:
+            for n_visited, masks in enumerate(popcount_layers(n_rest)[2:], 2):
+                start_time = time()
+                n_chunks = max(n_workers, -(-len(masks) // chunk_size))
+                n_chunks = min(n_chunks, len(masks))
+                list(executor.map(_relax_masks_worker, np.array_split(masks, n_chunks)))
+                log_info(
+                    "Held-Karp layer %d/%d: %d states in %.3f seconds",
+                    n_visited,
+                    n_rest,
+                    len(masks) * n_visited,
+                    time() - start_time,
+                )
+        return _finish_held_karp(dp, parents, distances[1:, 0], cities_names)
+    finally:
+        del dp, parents
+        for shm in (dp_shm, parents_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
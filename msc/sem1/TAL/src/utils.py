@@ -1,39 +1,82 @@
+import importlib.util
 import logging
+import multiprocessing
+import sys
+from functools import cache
 
-import coloredlogs
-import matplotlib.pyplot as plt
 import numpy as np
 
 from .config import Config
 
-# Set up logging
 _LOGGER = logging.getLogger(__name__)
-_HANDLER = logging.StreamHandler()
-_HANDLER.setLevel(logging.INFO)
-_LOGGER.addHandler(_HANDLER)
-coloredlogs.install(
-    level="INFO", logger=_LOGGER, fmt="%(asctime)s %(levelname)s %(message)s"
-)
+
+# Maximum number of distances computed at once by `distance_matrix`
+DISTANCE_BLOCK_SIZE = 1 << 20
+
+
+@cache
+def _get_logger():
+    """Setting up logging on the first logged message, \
+        so that coloredlogs is imported only by processes which log"""
+    import coloredlogs
+
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.INFO)
+    _LOGGER.addHandler(handler)
+    coloredlogs.install(
+        level="INFO", logger=_LOGGER, fmt="%(asctime)s %(levelname)s %(message)s"
+    )
+    return _LOGGER
 
 
 def log_debug(*args, **kwargs):
     """Log an debug message."""
-    _LOGGER.debug(*args, **kwargs)
+    _get_logger().debug(*args, **kwargs)
 
 
 def log_info(*args, **kwargs):
     """Log an info message."""
-    _LOGGER.info(*args, **kwargs)
+    _get_logger().info(*args, **kwargs)
 
 
 def log_warning(*args, **kwargs):
     """Log a warning message."""
-    _LOGGER.warning(*args, **kwargs)
+    _get_logger().warning(*args, **kwargs)
 
 
 def log_error(*args, **kwargs):
     """Log an error message."""
-    _LOGGER.error(*args, **kwargs)
+    _get_logger().error(*args, **kwargs)
+
+
+def is_installed(module_name):
+    """Checking whether an optional dependency can be imported, without importing it
+
+    Args:
+        module_name: Name of the module
+
+    Returns:
+        Whether the module is installed
+    """
+    return importlib.util.find_spec(module_name) is not None
+
+
+def pool_context(use_numba: bool = False):
+    """Choosing the start method of the process pools
+
+    The threading layers behind the parallel Numba kernels are not fork-safe,
+    a worker forked after a kernel has run can hang, so the workers are started
+    by a fork server instead whenever Numba is used or already imported.
+
+    Args:
+        use_numba: Whether the workers run the Numba kernels
+
+    Returns:
+        Multiprocessing context, None for the default one
+    """
+    if use_numba or "numba" in sys.modules:
+        return multiprocessing.get_context("forkserver")
+    return None
 
 
 def euclidean_distance(cord_1, cord_2):
@@ -49,6 +92,50 @@ def euclidean_distance(cord_1, cord_2):
     return np.sqrt(np.sum((np.array(cord_1) - np.array(cord_2)) ** 2))
 
 
+def distance_matrix(coords, dtype=np.float64, out=None):
+    """Calculating the dense matrix of distances between all pairs of cities, \
+        written block of rows by block of rows straight in its floating point \
+        type, so that the only temporaries are the coordinates differences \
+        of `DISTANCE_BLOCK_SIZE` pairs
+
+    Args:
+        coords: Array of shape (n_cities, 2) with cities coordinates
+        dtype: Floating point type of the returned matrix, unused if `out` is set
+        out: Matrix of shape (n_cities, n_cities) to fill, a new one if None
+
+    Returns:
+        Matrix of shape (n_cities, n_cities) with Euclidean distances
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    x, y = coords[:, 0], coords[:, 1]
+    if out is None:
+        out = np.empty((len(coords), len(coords)), dtype=dtype)
+    n_rows = max(1, DISTANCE_BLOCK_SIZE // max(len(coords), 1))
+    for start in range(0, len(coords), n_rows):
+        block = slice(start, start + n_rows)
+        np.hypot(
+            x[block, None] - x[None, :], y[block, None] - y[None, :], out=out[block]
+        )
+    return out
+
+
+def edge_overlap(tour_1, tour_2):
+    """Calculating the fraction of edges of one tour present in the other one
+
+    Args:
+        tour_1: First tour, list of cities names
+        tour_2: Second tour, list of cities names
+
+    Returns:
+        Fraction of shared undirected edges
+    """
+
+    def edges(tour):
+        return {frozenset(edge) for edge in zip(tour, tour[1:] + tour[:1])}
+
+    return len(edges(tour_1) & edges(tour_2)) / len(tour_1)
+
+
 def fig_to_numpy(fig):
     """Convert matplotlib figure to numpy array
 
@@ -59,8 +146,7 @@ def fig_to_numpy(fig):
         Numpy array of the figure
     """
     fig.canvas.draw()
-    data = np.frombuffer(fig.canvas.tostring_rgb(), dtype=np.uint8)
-    data = data.reshape(fig.canvas.get_width_height()[::-1] + (3,))
+    data = np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
     return data
 
 
@@ -73,6 +159,8 @@ def plot_route(
         config: Config object
         route: Route to plot
     """
+    import matplotlib.pyplot as plt
+
     citi_coords = config.city_coords
     x_shortest = [citi_coords[city_name][0] for city_name in cities_names]
     y_shortest = [citi_coords[city_name][1] for city_name in cities_names]
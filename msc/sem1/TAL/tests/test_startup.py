@@ -0,0 +1,46 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Cumulative import time of `src.main` allowed, in seconds
+IMPORT_TIME_BUDGET = 1.0
+
+# Dependencies which must be imported only by the code paths using them
+HEAVY_MODULES = ("matplotlib", "coloredlogs", "numba", "torch")
+
+
+def _import_main():
+    """Importing `src.main` in a fresh interpreter with `-X importtime`
+
+    Returns:
+        Import time report written to stderr, and the names of the heavy \
+            modules loaded by the import printed to stdout
+    """
+    code = (
+        "import sys\n"
+        "import src.main\n"
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return process.stderr, process.stdout.split()
+
+
+def test_import_time():
+    report, _ = _import_main()
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| src\.main$", report, re.M)
+    assert match is not None
+    assert int(match.group(1)) / 1e6 < IMPORT_TIME_BUDGET
+
+
+def test_heavy_modules_not_imported():
+    _, loaded = _import_main()
+    assert loaded == []